@@ -1,17 +1,26 @@
 import os
 import json
 import time
+import asyncio
+import orjson
+import atexit
+import queue
 import logging
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from concurrent.futures import ThreadPoolExecutor
 import anthropic
+from email.utils import parsedate_to_datetime
 from dotenv import load_dotenv
-from google_api.google_main import process_latest_email_from_sender
+from google_api.google_main import process_latest_email_from_sender, save_sender_state, NoNewMessages
 from pydantic import BaseModel, Field
 from typing import List, Optional
 import random
-from functools import wraps
+from functools import lru_cache, wraps
 import argparse
 from linkedin.linkedin_auth import LinkedInAuth
 from linkedin.linkedin_main import LinkedInPoster
+import topic_cache
 
 # Add at the beginning of the file
 parser = argparse.ArgumentParser(description='Process newsletter and create LinkedIn posts')
@@ -20,6 +29,7 @@ parser.add_argument('--topics', type=int, default=5, help='Number of topics to e
 parser.add_argument('--days', type=int, default=3, help='Number of days to schedule posts over (default: 3)')
 parser.add_argument('--sender', type=str, help='Email address of the newsletter sender (default: from .env)')
 parser.add_argument('--use-saved', action='store_true', help='Use previously saved posts instead of generating new ones')
+parser.add_argument('--only-new', action='store_true', help="Skip processing if the sender's latest email was already processed")
 args = parser.parse_args()
 
 # Configure logging
@@ -27,10 +37,17 @@ handlers = [logging.FileHandler("agent_flow.log")]
 if not args.quiet:
     handlers.append(logging.StreamHandler())
 
+# Log records are queued and written by a background listener thread,
+# so file and console I/O does not block the pipeline
+log_queue = queue.SimpleQueue()
+log_listener = QueueListener(log_queue, *handlers)
+log_listener.start()
+atexit.register(log_listener.stop)
+
 logging.basicConfig(
     level=logging.DEBUG,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=handlers
+    handlers=[QueueHandler(log_queue)]
 )
 logger = logging.getLogger("agent_flow")
 
@@ -38,14 +55,50 @@ logger = logging.getLogger("agent_flow")
 load_dotenv()
 logger.info("Environment variables loaded")
 
-def retry_anthropic_api(max_retries=3, initial_delay=2):
+# Configuration read once at import
+NEWSLETTER_SENDER = os.getenv("NEWSLETTER_SENDER")
+ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
+ANTHROPIC_MAX_CONCURRENCY = int(os.getenv("ANTHROPIC_MAX_CONCURRENCY", "5"))
+ANTHROPIC_MODEL = "claude-3-5-sonnet-20241022"
+
+# Cap concurrent Anthropic requests to stay under the account's concurrent-connection limit
+_ANTHROPIC_SEM = threading.BoundedSemaphore(ANTHROPIC_MAX_CONCURRENCY)
+
+# Anthropic client shared across calls so its HTTP connection pool is reused
+_ANTHROPIC_CLIENT: Optional[anthropic.Anthropic] = None
+_ANTHROPIC_CLIENT_LOCK = threading.Lock()
+
+def _get_client():
+    """Return the shared Anthropic client, creating it on first use."""
+    global _ANTHROPIC_CLIENT
+    if _ANTHROPIC_CLIENT is None:
+        with _ANTHROPIC_CLIENT_LOCK:
+            if _ANTHROPIC_CLIENT is None:
+                logger.debug("Initializing Anthropic client")
+                # SDK retries are disabled so retry_anthropic_api is the only retry
+                # layer and its backoff sleeps happen outside _ANTHROPIC_SEM
+                _ANTHROPIC_CLIENT = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY, max_retries=0)
+    return _ANTHROPIC_CLIENT
+
+# Transient Anthropic errors worth retrying: rate limits (429), overload (529),
+# other 5xx responses and dropped connections
+RETRYABLE_ANTHROPIC_ERRORS = (
+    anthropic.RateLimitError,
+    anthropic._exceptions.OverloadedError,
+    anthropic.InternalServerError,
+    anthropic.APIConnectionError,
+)
+
+def retry_anthropic_api(max_retries=3, initial_delay=2, max_delay=30):
     """
     Decorator that implements retry logic with exponential backoff for Anthropic API calls.
-    Specifically handles 529 Overloaded errors.
+    Handles rate limit (429), overloaded (529) and other transient server/connection errors.
+    If the API sends a retry-after header, it is used instead of the computed delay.
     
     Args:
         max_retries (int): Maximum number of retry attempts
         initial_delay (int): Initial delay in seconds before first retry
+        max_delay (int): Upper bound in seconds for a single backoff delay
         
     Returns:
         The decorated function with retry logic
@@ -59,7 +112,7 @@ def retry_anthropic_api(max_retries=3, initial_delay=2):
             while True:
                 try:
                     return func(*args, **kwargs)
-                except anthropic._exceptions.OverloadedError as e:
+                except RETRYABLE_ANTHROPIC_ERRORS as e:
                     retries += 1
                     if retries > max_retries:
                         logger.error(f"Max retries ({max_retries}) exceeded for Anthropic API call")
@@ -67,9 +120,18 @@ def retry_anthropic_api(max_retries=3, initial_delay=2):
                     
                     # Add jitter to avoid thundering herd problem
                     jitter = random.uniform(0.8, 1.2)
-                    sleep_time = delay * jitter
+                    sleep_time = min(delay * jitter, max_delay)
+                    
+                    # Prefer the server's retry-after hint when it sends one
+                    response = getattr(e, "response", None)
+                    retry_after = response.headers.get("retry-after") if response is not None else None
+                    if retry_after:
+                        try:
+                            sleep_time = min(float(retry_after), max_delay)
+                        except ValueError:
+                            pass
                     
-                    logger.warning(f"Anthropic API overloaded (529). Retrying in {sleep_time:.2f} seconds (attempt {retries}/{max_retries})")
+                    logger.warning(f"Anthropic API error ({type(e).__name__}). Retrying in {sleep_time:.2f} seconds (attempt {retries}/{max_retries})")
                     time.sleep(sleep_time)
                     
                     # Exponential backoff
@@ -78,6 +140,30 @@ def retry_anthropic_api(max_retries=3, initial_delay=2):
         return wrapper
     return decorator
 
+@retry_anthropic_api(max_retries=4, initial_delay=1)
+def _call_claude(client, system, user_message, max_tokens):
+    """
+    Send a single message to Claude, retrying transient API errors.
+    
+    Args:
+        client (anthropic.Anthropic): Anthropic client to use
+        system (str | list): System prompt, as text or a list of content blocks
+        user_message (str): User message content
+        max_tokens (int): Maximum number of tokens to generate
+        
+    Returns:
+        anthropic.types.Message: The API response message
+    """
+    with _ANTHROPIC_SEM:
+        return client.messages.create(
+            model=ANTHROPIC_MODEL,
+            system=system,
+            max_tokens=max_tokens,
+            messages=[
+                {"role": "user", "content": user_message}
+            ]
+        )
+
 class NewsletterTopic(BaseModel):
     """Model for a newsletter topic extracted from an email."""
     title: str = Field(description="Catchy title summarizing the topic")
@@ -100,13 +186,126 @@ class LinkedInPost(BaseModel):
     scheduled_for: Optional[str] = Field(None, description="Timestamp when the post is scheduled to be published")
     published: bool = Field(False, description="Whether the post has been published")
     
-def extract_newsletter_content(sender_email=None):
+# System prompts are module constants marked for Anthropic prompt caching, so
+# repeated calls within the cache lifetime skip reprocessing the instructions
+TOPIC_SYSTEM_PROMPT = """
+You are an expert content analyst specializing in extracting the most interesting and 
+engaging topics from newsletters. Your task is to analyze the provided newsletter content
+and extract the most interesting topics. The number of topics to extract is given
+after these instructions.
+
+For each topic, please provide:
+1. A catchy title
+2. A brief summary (2-3 sentences)
+3. 3-4 key points about why this topic is interesting or relevant
+4. Some personal thoughts that could be shared about this topic
+5. A list of relevant references (people, companies, organizations, products) mentioned in relation to this topic
+
+Be sure to extract specific names of people, companies, organizations, and products that are mentioned in the newsletter for each topic. These references are important for providing context and credibility to the LinkedIn posts.
+
+Format your response as valid JSON that matches the following Pydantic model structure:
+
+```python
+class NewsletterTopic(BaseModel):
+    title: str 
+    summary: str
+    key_points: List[str]
+    thoughts: str
+    references: List[str]
+
+class NewsletterContent(BaseModel):
+    newsletter_name: str
+    date: str
+    topics: List[NewsletterTopic]
+```
+
+Your output should be ONLY the JSON string, with no additional text before or after.
+"""
+
+POST_SYSTEM_PROMPT = """
+You are a professional content writer specializing in creating authentic, engaging LinkedIn posts.
+
+Your task is to write a LinkedIn post in first person that sounds like it was written by a real person sharing their thoughts on a topic they found interesting.
+
+The post should:
+1. Start with a powerful hook to capture attention (pick a hook from examples given below at randomn)
+2. Be written in a conversational, authentic first-person voice
+3. Include personal thoughts and opinions on the topic
+4. Be professionally written but not overly formal
+5. Include relevant hashtags (3-5) at the end
+6. Be between 100-150 words
+7. Mention any relevant people, companies, or organizations provided in the references
+
+CRITICAL GUARDRAILS:
+1. ABSOLUTELY NO sentences with the structure "It's not about X, it's about Y" or any variation of this pattern
+2. NEVER use dashes (-) within sentences to create dramatic pauses
+3. DO NOT invent fictional scenarios about "my team," "my company," or work experiences unless explicitly provided
+4. AVOID all forms of "not only X, but also Y" sentence structures
+5. NO phrases like "game-changer," "revolutionary," or other marketing buzzwords
+6. DO NOT claim things are "transformative," "changing everything," or similar hyperbole
+7. Dont always start with "I just learned that..." or "I just read that..."
+8. Dont always use sentences like "As someone who has..." or "As someone who works in..."
+
+Write as if you're a real person sharing a genuine insight or experience - not a marketer trying to sell something. Use natural language that a human would actually write in a casual professional setting.
+
+Popular hooks to consider using:
+- "I tried X for a week and here's what happened..."
+- "The surprising truth about..."
+- "What I wish I knew before..."
+- "This changed everything for me..."
+- "Unpopular opinion:"
+- "Behind-the-scenes look at..."
+- "This is why you need X..."
+- "I'm sure you've heard the news about..."
+- "Stop doing X if you want Y..."
+- "The biggest mistake people make with..."
+- "I just learned that..."
+- "Here's what no one tells you about..."
+
+
+Your output should be ONLY the LinkedIn post text, with no additional formatting or explanation.
+"""
+
+_TOPIC_SYSTEM_BLOCK = {"type": "text", "text": TOPIC_SYSTEM_PROMPT, "cache_control": {"type": "ephemeral"}}
+_POST_SYSTEM = [{"type": "text", "text": POST_SYSTEM_PROMPT, "cache_control": {"type": "ephemeral"}}]
+
+_JSON_DECODER = json.JSONDecoder()
+
+def _extract_json(text):
+    """
+    Parse a JSON object from a Claude response.
+    
+    Clean responses are parsed directly. If Claude wrapped the JSON in prose
+    or a code fence, decoding starts at the first '{' and ignores any
+    trailing text, avoiding a second API call for an otherwise valid answer.
+    
+    Args:
+        text (str): Response text from Claude
+        
+    Returns:
+        dict: The parsed JSON object
+        
+    Raises:
+        json.JSONDecodeError: If no JSON object can be decoded
+    """
+    try:
+        return orjson.loads(text)
+    except orjson.JSONDecodeError:
+        start = text.find('{')
+        if start == -1:
+            raise
+        obj, _ = _JSON_DECODER.raw_decode(text, start)
+        return obj
+
+def extract_newsletter_content(sender_email=None, only_new=False):
     """
     Extract the title, subject, and body from the latest email newsletter.
     
     Args:
         sender_email (str, optional): Email address of newsletter sender. 
                                       If None, uses NEWSLETTER_SENDER from env.
+        only_new (bool, optional): Return None if the sender has sent nothing
+                                   new since the last run.
     
     Returns:
         dict: Dictionary containing the email data with keys:
@@ -114,111 +313,111 @@ def extract_newsletter_content(sender_email=None):
             - date: Date of the newsletter
             - subject: Email subject
             - body: Decoded email body
+            - message_id: Gmail message ID
+            - history_id: Mailbox historyId to save once processed (only_new only)
         Returns None if no email is found.
+        
+    Raises:
+        NoNewMessages: With only_new, if the sender has sent nothing new
     """
-    logger.info(f"Extracting newsletter content from {sender_email or os.getenv('NEWSLETTER_SENDER')}")
+    sender_email = sender_email or NEWSLETTER_SENDER
+    logger.info(f"Extracting newsletter content from {sender_email}")
     
     try:
-        email_data = process_latest_email_from_sender(sender_email=sender_email)
+        email_data = process_latest_email_from_sender(sender_email=sender_email, only_new=only_new)
         
         if not email_data:
-            logger.warning(f"No email found from {sender_email or os.getenv('NEWSLETTER_SENDER')}")
+            logger.warning(f"No email found from {sender_email}")
             return None
         
-        logger.debug(f"Email retrieved successfully with subject: {email_data['subject']}")
-        logger.debug(f"Email body length: {len(email_data['body'])} characters")
+        logger.debug("Email retrieved successfully with subject: %s", email_data['subject'])
+        logger.debug("Email body length: %d characters", len(email_data['body']))
         
         # Extract newsletter name from subject if possible
         subject = email_data['subject']
         newsletter_name = subject.split(':', 1)[0] if ':' in subject else "Newsletter"
-        logger.debug(f"Extracted newsletter name: {newsletter_name}")
+        logger.debug("Extracted newsletter name: %s", newsletter_name)
         
         # Extract date from headers or use current date
-        date_header = next((header['value'] for header in email_data['headers'] 
-                            if header['name'] in ['Date', 'Received']), None)
+        headers_map = email_data['headers_map']
+        date_header = headers_map.get('Date') or headers_map.get('Received')
         
         if date_header:
-            logger.debug(f"Found date header: {date_header}")
-            # Simple date extraction - could be improved with proper parsing
-            date = date_header.split(',')[1].strip() if ',' in date_header else time.strftime("%B %d, %Y")
+            logger.debug("Found date header: %s", date_header)
+            try:
+                # Received headers end with "; <date>", Date headers are just the date
+                date = parsedate_to_datetime(date_header.rsplit(';', 1)[-1].strip()).strftime("%B %d, %Y")
+            except (TypeError, ValueError):
+                logger.debug("Could not parse date header, using current date")
+                date = time.strftime("%B %d, %Y")
         else:
             logger.debug("No date header found, using current date")
             date = time.strftime("%B %d, %Y")
         
-        logger.debug(f"Using date: {date}")
+        logger.debug("Using date: %s", date)
         
         result = {
             'newsletter_name': newsletter_name,
             'date': date,
             'subject': subject,
-            'body': email_data['body']
+            'body': email_data['body'],
+            'message_id': email_data['id'],
+            'history_id': email_data.get('history_id')
         }
         
         logger.info(f"Successfully extracted newsletter content: {newsletter_name} ({date})")
         return result
         
+    except NoNewMessages:
+        raise
     except Exception as e:
         logger.error(f"Error extracting newsletter content: {str(e)}", exc_info=True)
         return None
 
-@retry_anthropic_api(max_retries=2, initial_delay=2)
-def extract_topics_with_anthropic(newsletter_content, num_topics=5):
+def extract_topics_with_anthropic(newsletter_content, num_topics=5, use_cache=True):
     """
     Extract interesting topics from newsletter content using Anthropic's Claude API.
     
+    Results are cached in topic_cache.db by newsletter body, model and system
+    prompt, so re-processing the same newsletter does not call the API again.
+    
     Args:
         newsletter_content (dict): Dictionary containing newsletter content
         num_topics (int): Number of topics to extract
+        use_cache (bool): Set to False to always call the API and leave the cache untouched
     
     Returns:
-        str: JSON string containing extracted topics
+        dict: Validated newsletter content with extracted topics, or None on failure
     """
+    if not use_cache:
+        return _extract_topics_with_anthropic(newsletter_content, num_topics)
+    
+    return topic_cache.get_or_call(
+        newsletter_content['body'],
+        num_topics,
+        lambda: _extract_topics_with_anthropic(newsletter_content, num_topics),
+        model=ANTHROPIC_MODEL,
+        system_prompt=TOPIC_SYSTEM_PROMPT
+    )
+
+def _extract_topics_with_anthropic(newsletter_content, num_topics):
+    """Call Claude to extract topics, bypassing the topic cache."""
     logger.info(f"Extracting {num_topics} topics from {newsletter_content['newsletter_name']}")
     
     try:
         # Initialize Anthropic client
-        api_key = os.getenv("ANTHROPIC_API_KEY")
-        if not api_key:
+        if not ANTHROPIC_API_KEY:
             logger.error("ANTHROPIC_API_KEY not found in environment variables")
             return None
             
-        logger.debug("Initializing Anthropic client")
-        client = anthropic.Anthropic(api_key=api_key)
-        
-        # Construct prompt for Claude
-        logger.debug(f"Constructing system prompt for {num_topics} topics")
-        system_prompt = f"""
-        You are an expert content analyst specializing in extracting the most interesting and 
-        engaging topics from newsletters. Your task is to analyze the provided newsletter content
-        and extract exactly {num_topics} of the most interesting topics.
-        
-        For each topic, please provide:
-        1. A catchy title
-        2. A brief summary (2-3 sentences)
-        3. 3-4 key points about why this topic is interesting or relevant
-        4. Some personal thoughts that could be shared about this topic
-        5. A list of relevant references (people, companies, organizations, products) mentioned in relation to this topic
-
-        Be sure to extract specific names of people, companies, organizations, and products that are mentioned in the newsletter for each topic. These references are important for providing context and credibility to the LinkedIn posts.
-        
-        Format your response as valid JSON that matches the following Pydantic model structure:
-        
-        ```python
-        class NewsletterTopic(BaseModel):
-            title: str 
-            summary: str
-            key_points: List[str]
-            thoughts: str
-            references: List[str]
-            
-        class NewsletterContent(BaseModel):
-            newsletter_name: str
-            date: str
-            topics: List[NewsletterTopic]
-        ```
+        client = _get_client()
         
-        Your output should be ONLY the JSON string, with no additional text before or after.
-        """
+        # Static instructions are cached by Anthropic; only the topic count varies
+        logger.debug("Constructing system prompt for %d topics", num_topics)
+        system_prompt = [
+            _TOPIC_SYSTEM_BLOCK,
+            {"type": "text", "text": f"Extract exactly {num_topics} topics."},
+        ]
         
         logger.debug("Constructing user message with newsletter content")
         user_message = f"""
@@ -230,92 +429,177 @@ def extract_topics_with_anthropic(newsletter_content, num_topics=5):
         {newsletter_content['body']}
         """
         
-        logger.debug(f"User message length: {len(user_message)} characters")
+        logger.debug("User message length: %d characters", len(user_message))
         
         # Call Anthropic API
-        logger.info("Calling Anthropic API with claude-3-5-sonnet-20241022 model")
+        logger.info("Calling Anthropic API with %s model", ANTHROPIC_MODEL)
         start_time = time.time()
         
-        message = client.messages.create(
-            model="claude-3-5-sonnet-20241022",
-            system=system_prompt,
-            max_tokens=4000,
-            messages=[
-                {"role": "user", "content": user_message}
-            ]
-        )
+        message = _call_claude(client, system_prompt, user_message, max_tokens=4000)
         
         elapsed_time = time.time() - start_time
         logger.info(f"Anthropic API call completed in {elapsed_time:.2f} seconds")
         
         # Extract JSON from response
         response_content = message.content[0].text
-        logger.debug(f"Response content length: {len(response_content)} characters")
+        logger.debug("Response content length: %d characters", len(response_content))
         
         # Validate response with Pydantic
         try:
             logger.debug("Parsing JSON response")
-            content_json = json.loads(response_content)
+            content_json = _extract_json(response_content)
             
             logger.debug("Validating response with Pydantic models")
             validated_content = NewsletterContent(**content_json)
             
             logger.info(f"Successfully extracted and validated {len(validated_content.topics)} topics")
-            return json.dumps(validated_content.dict(), indent=2)
+            return validated_content.model_dump()
             
         except json.JSONDecodeError as e:
             logger.error(f"JSON decode error: {str(e)}")
-            logger.debug(f"Raw response content: {response_content[:500]}...")
-            return response_content
+            logger.debug("Raw response content: %.500s...", response_content)
+            return None
             
         except Exception as e:
             logger.error(f"Error validating response: {str(e)}", exc_info=True)
-            return response_content
+            return None
         
     except Exception as e:
         logger.error(f"Error calling Anthropic API: {str(e)}", exc_info=True)
         return None
 
-def process_newsletter(sender_email=None, num_topics=5):
+async def fetch_newsletter(sender_email=None, only_new=False):
     """
-    Process a newsletter email and extract interesting topics.
+    Fetch the latest newsletter from a sender without blocking the event loop.
+    
+    Args:
+        sender_email (str, optional): Email address of the sender to filter by
+        only_new (bool, optional): Skip the sender if the sender has sent nothing
+                                   new since the last run.
+        
+    Returns:
+        dict: Newsletter content (see extract_newsletter_content), or None
+    """
+    return await asyncio.to_thread(extract_newsletter_content, sender_email, only_new)
+
+async def extract_topics(newsletter_content, num_topics=5):
+    """
+    Extract topics from newsletter content without blocking the event loop.
+    
+    Args:
+        newsletter_content (dict): Dictionary containing newsletter content
+        num_topics (int): Number of topics to extract
+        
+    Returns:
+        dict: Validated newsletter content with extracted topics, or None
+    """
+    return await asyncio.to_thread(extract_topics_with_anthropic, newsletter_content, num_topics)
+
+async def run_pipeline(sender_email=None, num_topics=5, only_new=False):
+    """
+    Fetch one sender's latest newsletter and extract its topics.
     
     Args:
         sender_email (str, optional): Email address of the sender to filter by
         num_topics (int, optional): Number of topics to extract
+        only_new (bool, optional): Skip the sender if the sender has sent nothing
+                                   new since the last run.
         
     Returns:
-        dict: Dictionary containing extracted newsletter content and topics
+        dict: Dictionary containing extracted newsletter content and topics,
+              plus the message_id and history_id of the source email,
+              or None if any step fails
+              
+    Raises:
+        NoNewMessages: With only_new, if the sender has sent nothing new
+    """
+    # Extract newsletter content
+    newsletter_content = await fetch_newsletter(sender_email, only_new)
+    if not newsletter_content:
+        logger.error("Failed to extract newsletter content")
+        return None
+        
+    # Extract topics with Anthropic
+    topics_data = await extract_topics(newsletter_content, num_topics)
+    if not topics_data:
+        logger.error("Failed to extract topics")
+        return None
+        
+    logger.info(f"Successfully extracted {len(topics_data['topics'])} topics")
+    
+    # Identify the source email so the caller can mark it processed on success
+    topics_data['message_id'] = newsletter_content['message_id']
+    topics_data['history_id'] = newsletter_content['history_id']
+    return topics_data
+
+def process_newsletters(sender_emails, num_topics=5, only_new=False):
     """
-    logger.info("Starting newsletter processing pipeline")
+    Process the latest newsletter from several senders concurrently.
     
-    try:
-        # Extract newsletter content
-        newsletter_content = extract_newsletter_content(sender_email)
-        if not newsletter_content:
-            logger.error("Failed to extract newsletter content")
-            return None
-            
-        # Extract topics with Anthropic
-        topics_json = extract_topics_with_anthropic(newsletter_content, num_topics)
-        if not topics_json:
-            logger.error("Failed to extract topics")
-            return None
-            
-        # Parse JSON
-        try:
-            topics_data = json.loads(topics_json)
-            logger.info(f"Successfully extracted {len(topics_data['topics'])} topics")
-            return topics_data
-        except json.JSONDecodeError as e:
-            logger.error(f"Error parsing topics JSON: {str(e)}")
-            return None
-            
-    except Exception as e:
-        logger.error(f"Error in newsletter processing pipeline: {str(e)}", exc_info=True)
+    Each sender runs its own Gmail fetch -> Claude extraction pipeline, so one
+    sender's API calls overlap with another's instead of running back to back.
+    
+    Args:
+        sender_emails (List[str]): Email addresses of the senders to process.
+                                   None entries use NEWSLETTER_SENDER from env.
+        num_topics (int, optional): Number of topics to extract per newsletter
+        only_new (bool, optional): Skip the sender if the sender has sent nothing
+                                   new since the last run.
+        
+    Returns:
+        list: One result per sender, in the same order. Each result is the
+              extracted topics dictionary, or None if that sender failed
+              (or, with only_new, had nothing new).
+    """
+    return [
+        _pipeline_result(sender_email, result)
+        for sender_email, result in zip(sender_emails, _gather_pipelines(sender_emails, num_topics, only_new))
+    ]
+
+def _gather_pipelines(sender_emails, num_topics, only_new):
+    """Run run_pipeline for every sender concurrently, returning results or exceptions in order."""
+    logger.info(f"Starting newsletter processing pipeline for {len(sender_emails)} sender(s)")
+    
+    async def run_all():
+        return await asyncio.gather(
+            *(run_pipeline(sender_email, num_topics, only_new) for sender_email in sender_emails),
+            return_exceptions=True
+        )
+    
+    return asyncio.run(run_all())
+
+def _pipeline_result(sender_email, result):
+    """Log a run_pipeline exception and turn it into None; pass results through."""
+    if isinstance(result, NoNewMessages):
+        logger.info("Skipping %s: no new newsletter since the last run", sender_email or NEWSLETTER_SENDER)
+        return None
+    if isinstance(result, Exception):
+        logger.error(f"Error in newsletter processing pipeline for {sender_email or NEWSLETTER_SENDER}: {str(result)}",
+                     exc_info=result)
         return None
+    return result
+
+def process_newsletter(sender_email=None, num_topics=5, only_new=False):
+    """
+    Process a newsletter email and extract interesting topics.
+    
+    Args:
+        sender_email (str, optional): Email address of the sender to filter by
+        num_topics (int, optional): Number of topics to extract
+        only_new (bool, optional): Skip the sender if the sender has sent nothing
+                                   new since the last run.
+        
+    Returns:
+        dict: Dictionary containing extracted newsletter content and topics
+        
+    Raises:
+        NoNewMessages: With only_new, if the sender has sent nothing new
+    """
+    result = _gather_pipelines([sender_email], num_topics, only_new)[0]
+    if isinstance(result, NoNewMessages):
+        raise result
+    return _pipeline_result(sender_email, result)
 
-@retry_anthropic_api(max_retries=2, initial_delay=2)
 def generate_linkedin_post(topic):
     """
     Generate a LinkedIn post from a newsletter topic using Anthropic's Claude API.
@@ -331,59 +615,13 @@ def generate_linkedin_post(topic):
     
     try:
         # Initialize Anthropic client
-        api_key = os.getenv("ANTHROPIC_API_KEY")
-        if not api_key:
+        if not ANTHROPIC_API_KEY:
             logger.error("ANTHROPIC_API_KEY not found in environment variables")
             return None
             
-        logger.debug("Initializing Anthropic client")
-        client = anthropic.Anthropic(api_key=api_key)
-        
-        # Construct prompt for Claude
-        logger.debug("Constructing system prompt for LinkedIn post generation")
-        system_prompt = """
-        You are a professional content writer specializing in creating authentic, engaging LinkedIn posts.
-
-        Your task is to write a LinkedIn post in first person that sounds like it was written by a real person sharing their thoughts on a topic they found interesting.
-
-        The post should:
-        1. Start with a powerful hook to capture attention (pick a hook from examples given below at randomn)
-        2. Be written in a conversational, authentic first-person voice
-        3. Include personal thoughts and opinions on the topic
-        4. Be professionally written but not overly formal
-        5. Include relevant hashtags (3-5) at the end
-        6. Be between 100-150 words
-        7. Mention any relevant people, companies, or organizations provided in the references
-
-        CRITICAL GUARDRAILS:
-        1. ABSOLUTELY NO sentences with the structure "It's not about X, it's about Y" or any variation of this pattern
-        2. NEVER use dashes (-) within sentences to create dramatic pauses
-        3. DO NOT invent fictional scenarios about "my team," "my company," or work experiences unless explicitly provided
-        4. AVOID all forms of "not only X, but also Y" sentence structures
-        5. NO phrases like "game-changer," "revolutionary," or other marketing buzzwords
-        6. DO NOT claim things are "transformative," "changing everything," or similar hyperbole
-        7. Dont always start with "I just learned that..." or "I just read that..."
-        8. Dont always use sentences like "As someone who has..." or "As someone who works in..."
-
-        Write as if you're a real person sharing a genuine insight or experience - not a marketer trying to sell something. Use natural language that a human would actually write in a casual professional setting.
-
-        Popular hooks to consider using:
-        - "I tried X for a week and here's what happened..."
-        - "The surprising truth about..."
-        - "What I wish I knew before..."
-        - "This changed everything for me..."
-        - "Unpopular opinion:"
-        - "Behind-the-scenes look at..."
-        - "This is why you need X..."
-        - "I'm sure you've heard the news about..."
-        - "Stop doing X if you want Y..."
-        - "The biggest mistake people make with..."
-        - "I just learned that..."
-        - "Here's what no one tells you about..."
-
-
-        Your output should be ONLY the LinkedIn post text, with no additional formatting or explanation.
-        """
+        client = _get_client()
+        
+        system_prompt = _POST_SYSTEM
         
         # Prepare topic information for the prompt
         references_text = ", ".join(topic['references']) if topic['references'] else "None specified"
@@ -403,27 +641,20 @@ def generate_linkedin_post(topic):
         Please write an authentic, first-person LinkedIn post about this topic.
         """
         
-        logger.debug(f"User message length: {len(user_message)} characters")
+        logger.debug("User message length: %d characters", len(user_message))
         
         # Call Anthropic API
         logger.info("Calling Anthropic API to generate LinkedIn post")
         start_time = time.time()
         
-        message = client.messages.create(
-            model="claude-3-5-sonnet-20241022",
-            system=system_prompt,
-            max_tokens=1000,
-            messages=[
-                {"role": "user", "content": user_message}
-            ]
-        )
+        message = _call_claude(client, system_prompt, user_message, max_tokens=1000)
         
         elapsed_time = time.time() - start_time
         logger.info(f"LinkedIn post generation completed in {elapsed_time:.2f} seconds")
         
         # Extract post from response
         post_content = message.content[0].text.strip()
-        logger.debug(f"Generated LinkedIn post ({len(post_content)} characters)")
+        logger.debug("Generated LinkedIn post (%d characters)", len(post_content))
         
         # Create LinkedInPost object
         linkedin_post = LinkedInPost(
@@ -497,33 +728,78 @@ def schedule_linkedin_posts(posts, days=3):
         post.scheduled_for = formatted_time
         scheduled_posts.append(post)
         
-        logger.debug(f"Scheduled post '{post.topic_title}' for {formatted_time}")
+        logger.debug("Scheduled post '%s' for %s", post.topic_title, formatted_time)
     
     logger.info(f"Successfully scheduled {len(scheduled_posts)} posts")
     return scheduled_posts
 
 
-def publish_linkedin_post(post):
+# Authenticated LinkedIn session reused across posts until its token nears expiry
+_AUTH_SINGLETON: Optional[LinkedInAuth] = None
+_AUTH_LOCK = threading.Lock()
+# Re-authenticate when the access token has less than this many seconds left
+AUTH_REFRESH_MARGIN = 5 * 60
+# Worker threads used to publish due posts concurrently
+PUBLISH_MAX_WORKERS = 4
+
+def get_auth():
+    """
+    Return an authenticated LinkedInAuth, reusing the previous one while its
+    access token is valid for at least AUTH_REFRESH_MARGIN more seconds.
+    
+    Returns:
+        LinkedInAuth: Authenticated LinkedIn session, or None if authentication failed
+    """
+    global _AUTH_SINGLETON
+    with _AUTH_LOCK:
+        auth = _AUTH_SINGLETON
+        if auth is not None and auth.expires_at and auth.expires_at - time.time() > AUTH_REFRESH_MARGIN:
+            return auth
+        
+        # Release the HTTP session of the instance being replaced
+        if auth is not None:
+            auth.close()
+        _AUTH_SINGLETON = None
+        
+        auth = LinkedInAuth()
+        try:
+            authenticated = auth.authenticate()
+        except Exception:
+            auth.close()
+            raise
+        if not authenticated:
+            auth.close()
+            return None
+        
+        _AUTH_SINGLETON = auth
+        return auth
+
+def publish_linkedin_post(post, poster=None):
     """
     Publish a scheduled LinkedIn post using the LinkedIn API.
     
     Args:
         post (LinkedInPost): The post object to publish
+        poster (LinkedInPoster, optional): Already authenticated poster to use.
+                                           If None, authenticates and creates one.
         
     Returns:
         bool: True if the post was published successfully, False otherwise
     """
     logger.info(f"Publishing LinkedIn post: '{post.topic_title}'")
     
+    own_poster = poster is None
     try:
-        # Authenticate with LinkedIn
-        auth = LinkedInAuth()
-        if not auth.authenticate():
-            logger.error("LinkedIn authentication failed")
-            return False
-            
-        # Create poster and publish the post
-        poster = LinkedInPoster(auth.access_token, auth.person_id)
+        if own_poster:
+            # Authenticate with LinkedIn
+            auth = get_auth()
+            if not auth:
+                logger.error("LinkedIn authentication failed")
+                return False
+                
+            # Create poster to publish the post
+            poster = LinkedInPoster(auth.access_token, auth.person_id)
+        
         result = poster.post_message(post.content)
         
         if result:
@@ -538,12 +814,25 @@ def publish_linkedin_post(post):
     except Exception as e:
         logger.error(f"Error publishing LinkedIn post: {str(e)}")
         return False
+    
+    finally:
+        if own_poster and poster is not None:
+            poster.close()
+
+@lru_cache(maxsize=1024)
+def _parse_scheduled_for(scheduled_for):
+    """Convert a "%Y-%m-%d %H:%M:%S" local time string to a Unix timestamp."""
+    return time.mktime(time.strptime(scheduled_for, "%Y-%m-%d %H:%M:%S"))
 
 def publish_scheduled_posts(posts):
     """
     Publish all scheduled LinkedIn posts that are due (scheduled time has passed)
     and haven't been published yet.
     
+    Due posts are published concurrently by up to PUBLISH_MAX_WORKERS threads.
+    They share one LinkedIn authentication, and each worker thread keeps its
+    own HTTP session, reusing its connection for every post it publishes.
+    
     Args:
         posts (List[LinkedInPost]): List of scheduled LinkedIn posts
         
@@ -552,7 +841,7 @@ def publish_scheduled_posts(posts):
     """
     logger.info("Checking for scheduled posts due for publishing")
     
-    published_posts = []
+    due_posts = []
     current_time = time.time()
     
     for post in posts:
@@ -567,7 +856,7 @@ def publish_scheduled_posts(posts):
             
         # Convert scheduled time string to timestamp
         try:
-            scheduled_time = time.mktime(time.strptime(post.scheduled_for, "%Y-%m-%d %H:%M:%S"))
+            scheduled_time = _parse_scheduled_for(post.scheduled_for)
         except ValueError:
             logger.error(f"Invalid scheduled time format for post '{post.topic_title}': {post.scheduled_for}")
             continue
@@ -575,19 +864,52 @@ def publish_scheduled_posts(posts):
         # Check if it's time to publish
         if scheduled_time <= current_time:
             logger.info(f"Post '{post.topic_title}' is due for publishing (scheduled: {post.scheduled_for})")
-            
-            # Publish the post
-            if publish_linkedin_post(post):
-                published_posts.append(post)
+            due_posts.append(post)
+    
+    if not due_posts:
+        logger.info("No posts were due for publishing")
+        return []
+    
+    # Authenticate once for the whole batch
+    try:
+        auth = get_auth()
+    except Exception as e:
+        logger.error(f"Error authenticating with LinkedIn: {str(e)}")
+        return []
+    if not auth:
+        logger.error("LinkedIn authentication failed")
+        return []
+    
+    # requests.Session is not thread-safe, so each worker thread gets its own poster
+    worker_state = threading.local()
+    posters = []
+    posters_lock = threading.Lock()
+    
+    def publish_on_worker_session(post):
+        poster = getattr(worker_state, 'poster', None)
+        if poster is None:
+            poster = worker_state.poster = LinkedInPoster(auth.access_token, auth.person_id)
+            with posters_lock:
+                posters.append(poster)
+        return publish_linkedin_post(post, poster)
+    
+    try:
+        with ThreadPoolExecutor(max_workers=min(PUBLISH_MAX_WORKERS, len(due_posts))) as executor:
+            results = list(executor.map(publish_on_worker_session, due_posts))
+    finally:
+        for poster in posters:
+            poster.close()
+    
+    published_posts = [post for post, published in zip(due_posts, results) if published]
     
     if published_posts:
         logger.info(f"Successfully published {len(published_posts)} posts")
     else:
-        logger.info("No posts were due for publishing")
+        logger.info("No posts were published")
         
     return published_posts
 
-def process_newsletter_to_scheduled_posts(sender_email=None, num_topics=5, schedule_days=3):
+def process_newsletter_to_scheduled_posts(sender_email=None, num_topics=5, schedule_days=3, only_new=False):
     """
     Main function that orchestrates the entire process from fetching email newsletter
     to scheduling LinkedIn posts.
@@ -597,16 +919,19 @@ def process_newsletter_to_scheduled_posts(sender_email=None, num_topics=5, sched
                                       If None, uses NEWSLETTER_SENDER from env.
         num_topics (int, optional): Number of topics to extract from the newsletter.
         schedule_days (int, optional): Number of days to spread the posts over.
+        only_new (bool, optional): Skip processing if the sender has sent nothing
+                                   new since the last run. The newsletter is only
+                                   recorded as processed once posts were scheduled.
         
     Returns:
         List[LinkedInPost]: List of scheduled LinkedIn posts ready for publishing.
-                           Returns empty list if any step fails.
+                           Returns empty list if any step fails or nothing is new.
     """
     logger.info("Starting end-to-end newsletter processing pipeline")
     
     try:
         # Step 1: Process newsletter to extract topics
-        topics_data = process_newsletter(sender_email, num_topics)
+        topics_data = process_newsletter(sender_email, num_topics, only_new)
         if not topics_data or 'topics' not in topics_data:
             logger.error("Failed to extract topics from newsletter")
             return []
@@ -632,8 +957,19 @@ def process_newsletter_to_scheduled_posts(sender_email=None, num_topics=5, sched
         scheduled_posts = schedule_linkedin_posts(linkedin_posts, schedule_days)
         logger.info(f"Successfully scheduled {len(scheduled_posts)} posts over {schedule_days} days")
         
+        # Only now is the newsletter done, so a failed run is retried next time
+        if only_new:
+            save_sender_state(
+                sender_email or NEWSLETTER_SENDER,
+                history_id=topics_data['history_id'],
+                message_id=topics_data['message_id']
+            )
+        
         return scheduled_posts
         
+    except NoNewMessages:
+        logger.info("No new newsletter from %s since the last run, skipping", sender_email or NEWSLETTER_SENDER)
+        return []
     except Exception as e:
         logger.error(f"Error in end-to-end newsletter processing: {str(e)}", exc_info=True)
         return []
@@ -658,15 +994,18 @@ def save_scheduled_posts(posts, filename="scheduled_posts.json"):
         # Load existing posts if file exists
         existing_posts = []
         if os.path.exists(filename):
-            with open(filename, "r") as f:
-                existing_posts = json.load(f)
+            with open(filename, "rb") as f:
+                existing_posts = orjson.loads(f.read())
                 
         # Combine existing and new posts
         all_posts = existing_posts + new_posts_data
         
-        # Save combined posts to file
-        with open(filename, "w") as f:
-            json.dump(all_posts, f, indent=2)
+        # Write to a temporary file and swap it in, so a crash mid-write
+        # never leaves a truncated posts file behind
+        tmp_filename = f"{filename}.tmp"
+        with open(tmp_filename, "wb") as f:
+            f.write(orjson.dumps(all_posts, option=orjson.OPT_INDENT_2))
+        os.replace(tmp_filename, filename)
             
         logger.info(f"Successfully saved {len(all_posts)} total posts to {filename}")
         return True
@@ -695,8 +1034,8 @@ def load_scheduled_posts(filename="scheduled_posts.json"):
             return []
             
         # Load from file
-        with open(filename, "r") as f:
-            posts_data = json.load(f)
+        with open(filename, "rb") as f:
+            posts_data = orjson.loads(f.read())
             
         # Convert dictionaries to LinkedInPost objects
         posts = [LinkedInPost(**post_data) for post_data in posts_data]
@@ -723,14 +1062,16 @@ if __name__ == "__main__":
             scheduled_posts = process_newsletter_to_scheduled_posts(
                 sender_email=args.sender,
                 num_topics=args.topics,
-                schedule_days=args.days
+                schedule_days=args.days,
+                only_new=args.only_new
             )
     else:
         logger.info("Generating new posts")
         scheduled_posts = process_newsletter_to_scheduled_posts(
             sender_email=args.sender,
             num_topics=args.topics,
-            schedule_days=args.days
+            schedule_days=args.days,
+            only_new=args.only_new
         )
     
     # Display scheduled posts
@@ -1,8 +1,10 @@
 import os
-import pickle
-import json
+import threading
+import httplib2
+from google_auth_httplib2 import AuthorizedHttp
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
+from google.oauth2.credentials import Credentials
 from googleapiclient.discovery import build
 from dotenv import load_dotenv
 
@@ -12,51 +14,73 @@ load_dotenv()
 # Define the scopes your application needs
 SCOPES = ['https://www.googleapis.com/auth/gmail.readonly']
 
-def get_gmail_service():
-    """Gets authenticated Gmail API service."""
-    creds = None
-    
-    # The file token.pickle stores the user's access and refresh tokens
-    if os.path.exists('token.pickle'):
-        with open('token.pickle', 'rb') as token:
-            creds = pickle.load(token)
-    
-    # If there are no valid credentials available, let the user log in
-    if not creds or not creds.valid:
-        if creds and creds.expired and creds.refresh_token:
-            creds.refresh(Request())
-        else:
-            # Create credentials.json dynamically from environment variables
-            credentials_data = {
-                "installed": {
-                    "client_id": os.getenv("GOOGLE_CLIENT_ID"),
-                    "project_id": os.getenv("GOOGLE_PROJECT_ID"),
-                    "auth_uri": os.getenv("GOOGLE_AUTH_URI"),
-                    "token_uri": os.getenv("GOOGLE_TOKEN_URI"),
-                    "auth_provider_x509_cert_url": os.getenv("GOOGLE_AUTH_PROVIDER_CERT_URL"),
-                    "client_secret": os.getenv("GOOGLE_CLIENT_SECRET"),
-                    "redirect_uris": [os.getenv("GOOGLE_REDIRECT_URIS")]
+# Stores the user's access and refresh tokens between runs
+TOKEN_FILE = 'token.json'
+
+# Credentials are shared by the whole process. The Gmail service is built once
+# per thread, because httplib2 connections must not be used concurrently.
+_creds = None
+_creds_lock = threading.Lock()
+_local = threading.local()
+
+def get_credentials():
+    """Loads, refreshes or obtains the user's Gmail OAuth credentials."""
+    global _creds
+    with _creds_lock:
+        if _creds is not None:
+            return _creds
+        
+        creds = None
+        
+        if os.path.exists(TOKEN_FILE):
+            creds = Credentials.from_authorized_user_file(TOKEN_FILE, SCOPES)
+        
+        # If there are no valid credentials available, let the user log in
+        if not creds or not creds.valid:
+            if creds and creds.expired and creds.refresh_token:
+                creds.refresh(Request())
+            else:
+                # Build the OAuth client config from environment variables
+                credentials_data = {
+                    "installed": {
+                        "client_id": os.getenv("GOOGLE_CLIENT_ID"),
+                        "project_id": os.getenv("GOOGLE_PROJECT_ID"),
+                        "auth_uri": os.getenv("GOOGLE_AUTH_URI"),
+                        "token_uri": os.getenv("GOOGLE_TOKEN_URI"),
+                        "auth_provider_x509_cert_url": os.getenv("GOOGLE_AUTH_PROVIDER_CERT_URL"),
+                        "client_secret": os.getenv("GOOGLE_CLIENT_SECRET"),
+                        "redirect_uris": [os.getenv("GOOGLE_REDIRECT_URIS")]
+                    }
                 }
-            }
-            
-            # Write credentials to temporary file
-            with open('temp_credentials.json', 'w') as f:
-                json.dump(credentials_data, f)
                 
-            flow = InstalledAppFlow.from_client_secrets_file(
-                'temp_credentials.json', SCOPES)
-            creds = flow.run_local_server(port=0)
+                flow = InstalledAppFlow.from_client_config(credentials_data, SCOPES)
+                creds = flow.run_local_server(port=0)
             
-            # Remove temporary credentials file
-            if os.path.exists('temp_credentials.json'):
-                os.remove('temp_credentials.json')
+            # Save the credentials for the next run
+            with open(TOKEN_FILE, 'w') as token:
+                token.write(creds.to_json())
         
-        # Save the credentials for the next run
-        with open('token.pickle', 'wb') as token:
-            pickle.dump(creds, token)
+        _creds = creds
+        return _creds
+
+def get_gmail_service():
+    """
+    Gets authenticated Gmail API service.
+    
+    The service is built once per thread and reused, so Gmail calls share a
+    keep-alive HTTP connection instead of opening a new one each time.
+    Expired access tokens are refreshed automatically by the authorized transport.
+    """
+    service = getattr(_local, 'service', None)
+    if service is not None:
+        return service
     
-    # Build and return the Gmail service
-    service = build('gmail', 'v1', credentials=creds)
+    # Build the Gmail service on a persistent HTTP connection, using the
+    # discovery document bundled with google-api-python-client instead of
+    # fetching it over the network
+    http = AuthorizedHttp(get_credentials(), http=httplib2.Http(timeout=60))
+    service = build('gmail', 'v1', http=http, cache_discovery=False, static_discovery=True)
+    _local.service = service
     return service
 
 # Example usage
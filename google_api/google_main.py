@@ -1,11 +1,99 @@
 import os
+import json
+import sqlite3
+import itertools
+import threading
+from contextlib import closing
 from google_api.gmail_auth import get_gmail_service
+from googleapiclient.errors import HttpError
 import base64
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+# Default newsletter sender, read once at import
+NEWSLETTER_SENDER = os.getenv("NEWSLETTER_SENDER")
+
+# Gmail accepts at most 100 calls in a single batch request
+BATCH_SIZE = 100
+# Largest page Gmail returns from messages.list
+MAX_PAGE_SIZE = 500
+
+# Remembers, per sender, the last successfully processed message and the
+# mailbox historyId captured when it was fetched, so --only-new runs can skip
+# old newsletters. Written by the caller once processing has succeeded.
+STATE_FILE = '.state.json'
+_state_lock = threading.Lock()
+
+# Gmail message IDs already downloaded by process_latest_emails_from_sender
+SEEN_DB = 'seen_msgs.db'
+# IDs looked up per query, under SQLite's default limit of 999 bound parameters
+SEEN_QUERY_CHUNK = 500
+
+class NoNewMessages(Exception):
+    """Raised by an only_new fetch when the sender has sent nothing new since the last run."""
+
+def load_sender_state(sender_email):
+    """
+    Return the state saved for a sender on a previous run.
+    
+    Returns:
+        dict: Possibly empty, with keys:
+            - history_id: Mailbox historyId captured before the sender's mail was listed
+            - message_id: Gmail ID of the sender's last processed message
+    """
+    with _state_lock:
+        if not os.path.exists(STATE_FILE):
+            return {}
+        with open(STATE_FILE, 'r') as f:
+            return json.load(f).get('senders', {}).get(sender_email, {})
+
+def save_sender_state(sender_email, **fields):
+    """Merge fields (see load_sender_state) into the state saved for a sender."""
+    with _state_lock:
+        state = {}
+        if os.path.exists(STATE_FILE):
+            with open(STATE_FILE, 'r') as f:
+                state = json.load(f)
+        state.setdefault('senders', {}).setdefault(sender_email, {}).update(fields)
+        with open(STATE_FILE, 'w') as f:
+            json.dump(state, f, indent=2)
+
+def get_mailbox_history_id(service):
+    """Return the mailbox's current historyId."""
+    return service.users().getProfile(userId='me').execute()['historyId']
+
+def open_seen_db():
+    """Open the store of Gmail message IDs that have already been downloaded."""
+    conn = sqlite3.connect(SEEN_DB)
+    conn.execute("CREATE TABLE IF NOT EXISTS seen (id TEXT PRIMARY KEY)")
+    return conn
+
+def has_new_messages(service, start_history_id):
+    """
+    Ask Gmail whether any message was added to the mailbox since a historyId.
+    
+    Args:
+        service: Authenticated Gmail API service
+        start_history_id (str): historyId saved on a previous run
+        
+    Returns:
+        bool: False only if Gmail confirms nothing was added. An expired
+              historyId is treated as "maybe", so the caller does a full fetch.
+    """
+    try:
+        response = service.users().history().list(
+            userId='me', startHistoryId=start_history_id,
+            historyTypes=['messageAdded'], maxResults=1
+        ).execute()
+    except HttpError as e:
+        # Gmail returns 404 once the historyId is too old to diff against
+        if e.resp.status == 404:
+            return True
+        raise
+    return bool(response.get('history'))
+
 def get_body_data(payload):
     """
     Extract the email body data from the message payload.
@@ -25,7 +113,65 @@ def get_body_data(payload):
     else:
         return payload['body'].get('data', '')
 
-def process_latest_email_from_sender(sender_email=None, debug=False):
+def iter_messages(service, query, page_size=MAX_PAGE_SIZE):
+    """
+    Iterate over all messages matching a query, following nextPageToken.
+    
+    Args:
+        service: Authenticated Gmail API service
+        query (str): Gmail search query
+        page_size (int): Number of messages to request per page
+        
+    Yields:
+        dict: Message stubs with 'id' and 'threadId' keys, newest first
+    """
+    request = service.users().messages().list(userId='me', q=query, maxResults=page_size)
+    while request is not None:
+        response = request.execute()
+        yield from response.get('messages', [])
+        request = service.users().messages().list_next(request, response)
+
+def parse_message(msg):
+    """
+    Extract the subject and decoded body from a full Gmail API message.
+    
+    Args:
+        msg (dict): Message resource fetched with format='full'
+        
+    Returns:
+        dict: Dictionary containing email data with keys:
+            - id: Gmail message ID
+            - headers: Email headers
+            - headers_map: Email headers keyed by name
+            - subject: Email subject
+            - body: Decoded email body
+    """
+    # Extract headers
+    headers = msg['payload']['headers']
+    headers_map = {header['name']: header['value'] for header in headers}
+    subject = headers_map.get('Subject', 'No Subject')
+    
+    # Get the encoded body
+    encoded_body = get_body_data(msg['payload'])
+    
+    # Decode the base64 content
+    if encoded_body:
+        # Work on bytes and pad in the same step, so the body is copied once
+        raw = encoded_body.encode('ascii')
+        decoded = base64.urlsafe_b64decode(raw + b'=' * (-len(raw) % 4))
+        body = decoded.decode('utf-8', errors='replace')
+    else:
+        body = ''
+
+    return {
+        'id': msg['id'],
+        'headers': headers,
+        'headers_map': headers_map,
+        'subject': subject,
+        'body': body
+    }
+
+def process_latest_email_from_sender(sender_email=None, debug=False, only_new=False):
     """
     Retrieves and processes only the latest email from the specified sender.
     
@@ -33,20 +179,37 @@ def process_latest_email_from_sender(sender_email=None, debug=False):
         sender_email (str): Email address of the sender to retrieve emails from
                            If None, will use NEWSLETTER_SENDER from env variables
         debug (bool): Whether to print debug information
+        only_new (bool): Skip the download if the sender's newest message is the
+                         one saved by save_sender_state on a previous run
         
     Returns:
         dict: Dictionary containing email data with keys:
+            - id: Gmail message ID
             - headers: Email headers
+            - headers_map: Email headers keyed by name
             - subject: Email subject
             - body: Decoded email body
+            - history_id: Mailbox historyId captured before listing (only_new only);
+                          pass it to save_sender_state once the email is processed
             Returns None if no email found
+            
+    Raises:
+        NoNewMessages: With only_new, if the sender has sent nothing new
     """
     # Get sender email from environment if not provided
     if sender_email is None:
-        sender_email = os.getenv("NEWSLETTER_SENDER")
+        sender_email = NEWSLETTER_SENDER
         
     service = get_gmail_service()
     
+    # One cheap history call answers "anything new?" before listing and downloading
+    if only_new:
+        state = load_sender_state(sender_email)
+        if state.get('history_id') and not has_new_messages(service, state['history_id']):
+            raise NoNewMessages(f"No new messages since last run for {sender_email}")
+        # Captured before listing, so mail arriving after this point is seen next run
+        history_id = get_mailbox_history_id(service)
+    
     # Search for emails from the specific sender, sorted by date (newest first)
     query = f"from:{sender_email}"
     results = service.users().messages().list(userId='me', q=query, maxResults=1).execute()
@@ -57,43 +220,99 @@ def process_latest_email_from_sender(sender_email=None, debug=False):
             print(f"No messages found from {sender_email}")
         return None
     
+    # Get the latest message (first in the list)
+    latest_message = messages[0]
+    
+    # Other mail arrived, but the sender's newest message was already processed
+    if only_new and latest_message['id'] == state.get('message_id'):
+        save_sender_state(sender_email, history_id=history_id)
+        raise NoNewMessages(f"No new messages from {sender_email} since last run")
+    
     if debug:
         print(f"Retrieved latest message from {sender_email}")
     
-    # Get the latest message (first in the list)
-    latest_message = messages[0]
     msg = service.users().messages().get(userId='me', id=latest_message['id'], format='full').execute()
     
-    # Extract headers
-    headers = msg['payload']['headers']
-    subject = next((header['value'] for header in headers if header['name'] == 'Subject'), 'No Subject')
+    email_data = parse_message(msg)
+    if only_new:
+        email_data['history_id'] = history_id
     
     if debug:
-        print(f"Subject: {subject}")
+        print(f"Subject: {email_data['subject']}")
+        print(f"\nBody preview:\n{email_data['body'][:500]}\n")
+
+    return email_data
+
+def process_latest_emails_from_sender(sender_email=None, max_results=20, debug=False, skip_seen=False):
+    """
+    Retrieves and processes the latest emails from the specified sender.
     
-    # Get the encoded body
-    encoded_body = get_body_data(msg['payload'])
+    Message bodies are fetched with Gmail batch requests (up to 100 messages
+    per HTTP round trip) instead of one request per message.
     
-    # Decode the base64 content
-    if encoded_body:
-        # Add padding if necessary
-        padding = len(encoded_body) % 4
-        if padding:
-            encoded_body += '=' * (4 - padding)
+    Args:
+        sender_email (str): Email address of the sender to retrieve emails from
+                           If None, will use NEWSLETTER_SENDER from env variables
+        max_results (int): Maximum number of emails to retrieve
+        debug (bool): Whether to print debug information
+        skip_seen (bool): Skip messages downloaded by a previous skip_seen call,
+                          so a poll with no new mail makes no get requests
         
-        # Replace URL-safe characters and decode
-        body = base64.urlsafe_b64decode(encoded_body).decode('utf-8')
-    else:
-        body = ''
-
+    Returns:
+        list: Email data dictionaries (see parse_message), newest first.
+              Messages that failed to download are skipped.
+    """
+    # Get sender email from environment if not provided
+    if sender_email is None:
+        sender_email = NEWSLETTER_SENDER
+        
+    service = get_gmail_service()
+    
+    query = f"from:{sender_email}"
+    page_size = min(max_results, MAX_PAGE_SIZE)
+    message_ids = [
+        message['id']
+        for message in itertools.islice(iter_messages(service, query, page_size), max_results)
+    ]
+    
+    if skip_seen:
+        seen = set()
+        with closing(open_seen_db()) as conn:
+            for start in range(0, len(message_ids), SEEN_QUERY_CHUNK):
+                chunk = message_ids[start:start + SEEN_QUERY_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                seen.update(row[0] for row in conn.execute(f"SELECT id FROM seen WHERE id IN ({placeholders})", chunk))
+        message_ids = [message_id for message_id in message_ids if message_id not in seen]
+    
     if debug:
-        print(f"\nBody preview:\n{body[:500]}\n")
-
-    return {
-        'headers': headers,
-        'subject': subject,
-        'body': body
-    }
+        print(f"Found {len(message_ids)} {'new ' if skip_seen else ''}messages from {sender_email}")
+    
+    responses = {}
+    
+    def on_message(request_id, response, exception):
+        if exception is not None:
+            if debug:
+                print(f"Failed to fetch message {request_id}: {exception}")
+            return
+        responses[request_id] = response
+    
+    for start in range(0, len(message_ids), BATCH_SIZE):
+        batch = service.new_batch_http_request(callback=on_message)
+        for message_id in message_ids[start:start + BATCH_SIZE]:
+            batch.add(
+                service.users().messages().get(userId='me', id=message_id, format='full'),
+                request_id=message_id
+            )
+        batch.execute()
+    
+    # Batch callbacks can arrive in any order, so restore the list order
+    emails = [parse_message(responses[message_id]) for message_id in message_ids if message_id in responses]
+    
+    if skip_seen and emails:
+        with closing(open_seen_db()) as conn, conn:
+            conn.executemany("INSERT OR IGNORE INTO seen (id) VALUES (?)", [(email['id'],) for email in emails])
+    
+    return emails
 
 # Example usage
 if __name__ == '__main__':
@@ -110,4 +329,4 @@ if __name__ == '__main__':
         # 2. Generate LinkedIn posts for each topic
         # 3. Schedule posts over next 3 days
     else:
-        print(f"Failed to retrieve any emails from {os.getenv('NEWSLETTER_SENDER')}")
\ No newline at end of file
+        print(f"Failed to retrieve any emails from {NEWSLETTER_SENDER}")
\ No newline at end of file
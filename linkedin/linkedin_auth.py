@@ -1,6 +1,6 @@
 import os
 import requests
-import json
+import orjson
 import webbrowser
 from http.server import HTTPServer, BaseHTTPRequestHandler
 import urllib.parse
@@ -11,6 +11,14 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
+# LinkedIn app credentials, read once at import
+LINKEDIN_CLIENT_ID = os.getenv("LINKEDIN_CLIENT_ID")
+LINKEDIN_CLIENT_SECRET = os.getenv("LINKEDIN_CLIENT_SECRET")
+LINKEDIN_REDIRECT_URI = os.getenv("LINKEDIN_REDIRECT_URI")
+
+# Seconds to wait for LinkedIn API responses
+REQUEST_TIMEOUT = 30
+
 class OAuthHandler(BaseHTTPRequestHandler):
     """Handler for the OAuth callback."""
     
@@ -24,6 +32,7 @@ class OAuthHandler(BaseHTTPRequestHandler):
         query_components = urllib.parse.parse_qs(urllib.parse.urlparse(self.path).query)
         if 'code' in query_components:
             self.server.authorization_code = query_components['code'][0]
+            self.server.code_event.set()
             self.wfile.write(b'Authorization successful! You can close this window now.')
         else:
             self.wfile.write(b'Authorization failed. Please try again.')
@@ -32,11 +41,18 @@ class LinkedInAuth:
     def __init__(self, client_id=None, client_secret=None, redirect_uri=None):
         """Initialize with LinkedIn app credentials."""
         # Use provided values or fallback to environment variables
-        self.client_id = client_id or os.getenv("LINKEDIN_CLIENT_ID")
-        self.client_secret = client_secret or os.getenv("LINKEDIN_CLIENT_SECRET")
-        self.redirect_uri = redirect_uri or os.getenv("LINKEDIN_REDIRECT_URI")
+        self.client_id = client_id or LINKEDIN_CLIENT_ID
+        self.client_secret = client_secret or LINKEDIN_CLIENT_SECRET
+        self.redirect_uri = redirect_uri or LINKEDIN_REDIRECT_URI
         self.access_token = None
+        self.expires_at = None
         self.person_id = None
+        # Reuse one connection for the token and profile requests
+        self._session = requests.Session()
+    
+    def close(self):
+        """Close the underlying HTTP session."""
+        self._session.close()
     
     def get_authorization_url(self):
         """Generate the authorization URL for LinkedIn OAuth."""
@@ -47,6 +63,7 @@ class LinkedInAuth:
         """Start a local HTTP server to receive the callback."""
         server = HTTPServer(('localhost', port), OAuthHandler)
         server.authorization_code = None
+        server.code_event = threading.Event()
         
         # Run server in a separate thread
         server_thread = threading.Thread(target=server.serve_forever)
@@ -66,10 +83,12 @@ class LinkedInAuth:
             'client_secret': self.client_secret
         }
         
-        response = requests.post(url, data=payload)
+        response = self._session.post(url, data=payload, timeout=REQUEST_TIMEOUT)
         if response.status_code == 200:
-            token_data = response.json()
+            token_data = orjson.loads(response.content)
             self.access_token = token_data['access_token']
+            # Unix time at which the access token stops working
+            self.expires_at = time.time() + token_data.get('expires_in', 0)
             return self.access_token
         else:
             print(f"Error getting access token: {response.status_code}")
@@ -89,9 +108,9 @@ class LinkedInAuth:
             'X-Restli-Protocol-Version': '2.0.0'
         }
         
-        response = requests.get(url, headers=headers)
+        response = self._session.get(url, headers=headers, timeout=REQUEST_TIMEOUT)
         if response.status_code == 200:
-            profile_data = response.json()
+            profile_data = orjson.loads(response.content)
             # Extract LinkedIn sub field which is your LinkedIn ID
             self.person_id = profile_data.get('sub')
             return profile_data
@@ -112,9 +131,7 @@ class LinkedInAuth:
         webbrowser.open(auth_url)
         
         # Wait for the authorization code (max 2 minutes)
-        timeout = time.time() + 120
-        while not server.authorization_code and time.time() < timeout:
-            time.sleep(1)
+        server.code_event.wait(timeout=120)
         
         # Shutdown the server
         server.shutdown()
@@ -1,17 +1,67 @@
 import os
-import json
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
 from linkedin.linkedin_auth import LinkedInAuth
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+# (connect, read) timeouts in seconds for LinkedIn API requests
+REQUEST_TIMEOUT = (3.05, 10)
+
+_VALID_VISIBILITY = frozenset({"PUBLIC", "CONNECTIONS", "SELF", "LOGGED_IN"})
+
+# Menu choices offered by main(), mapped to LinkedIn visibility values
+_VISIBILITY_CHOICES = {
+    "1": "PUBLIC",
+    "2": "CONNECTIONS",
+    "3": "SELF",
+    "4": "LOGGED_IN"
+}
+
 class LinkedInPoster:
     def __init__(self, access_token, person_id):
         """Initialize with access token and person ID."""
         self.access_token = access_token
         self.person_id = person_id
+        self._author_urn = f"urn:li:person:{person_id}"
+        
+        # The token is fixed for the lifetime of the poster, so build the headers once
+        self._headers = {
+            'Authorization': f'Bearer {self.access_token}',
+            'Content-Type': 'application/json',
+            'X-Restli-Protocol-Version': '2.0.0'
+        }
+        
+        # Pooled keep-alive session so repeated posts reuse the same connection.
+        # Creating a share is not idempotent, so only retry when LinkedIn cannot
+        # have created it: throttling (429, honouring Retry-After) and failed
+        # connects. 5xx responses and read errors are returned as-is, and the
+        # last response is returned instead of raising once retries run out.
+        retry = Retry(
+            total=3,
+            connect=3,
+            read=0,
+            backoff_factor=0.5,
+            status_forcelist=[429],
+            allowed_methods=["POST"],
+            raise_on_status=False
+        )
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=10, max_retries=retry))
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def close(self):
+        """Close the underlying HTTP session."""
+        self.session.close()
     
     def post_message(self, message, visibility="PUBLIC"):
         """
@@ -29,20 +79,16 @@ class LinkedInPoster:
             bool: True if posting was successful, False otherwise
         """
         # Validate visibility
-        valid_visibilities = ["PUBLIC", "CONNECTIONS", "SELF", "LOGGED_IN"]
-        if visibility not in valid_visibilities:
+        if visibility not in _VALID_VISIBILITY:
             print(f"Invalid visibility: {visibility}. Using PUBLIC as default.")
             visibility = "PUBLIC"
         
         # Set API endpoint
         url = 'https://api.linkedin.com/v2/ugcPosts'
         
-        # Prepare author URN
-        author_urn = f"urn:li:person:{self.person_id}"
-        
         # Prepare post data
         post_data = {
-            "author": author_urn,
+            "author": self._author_urn,
             "lifecycleState": "PUBLISHED",
             "specificContent": {
                 "com.linkedin.ugc.ShareContent": {
@@ -57,15 +103,8 @@ class LinkedInPoster:
             }
         }
         
-        # Set headers
-        headers = {
-            'Authorization': f'Bearer {self.access_token}',
-            'Content-Type': 'application/json',
-            'X-Restli-Protocol-Version': '2.0.0'
-        }
-        
         # Make the POST request
-        response = requests.post(url, headers=headers, json=post_data)
+        response = self.session.post(url, headers=self._headers, data=orjson.dumps(post_data), timeout=REQUEST_TIMEOUT)
         
         # Check response
         if response.status_code == 201:
@@ -91,18 +130,11 @@ def main():
         print("4. LOGGED_IN - Visible to all LinkedIn members")
         visibility_choice = input("Choose visibility (1-4) or press Enter for PUBLIC: ")
         
-        visibility_map = {
-            "1": "PUBLIC",
-            "2": "CONNECTIONS", 
-            "3": "SELF",
-            "4": "LOGGED_IN"
-        }
-        
-        visibility = visibility_map.get(visibility_choice, "PUBLIC")
+        visibility = _VISIBILITY_CHOICES.get(visibility_choice, "PUBLIC")
         
         # Create poster and post message
-        poster = LinkedInPoster(auth.access_token, auth.person_id)
-        result = poster.post_message(message, visibility)
+        with LinkedInPoster(auth.access_token, auth.person_id) as poster:
+            result = poster.post_message(message, visibility)
         
         if result:
             print(f"Successfully posted to LinkedIn with {visibility} visibility!")
@@ -0,0 +1,23 @@
+import time
+import pytest
+from dotenv import load_dotenv
+
+# Load environment variables once for the whole test session
+load_dotenv()
+
+@pytest.fixture(scope="session")
+def post_pool():
+    """Unscheduled template posts built once per session. Do not mutate; use posts."""
+    # Imported here so test modules that never touch agent_flow don't import it
+    from agent_flow import LinkedInPost
+    
+    now = time.strftime("%Y-%m-%d %H:%M:%S")
+    return [
+        LinkedInPost(topic_title=f"Test Topic {i+1}", content=f"This is test post {i+1}", generated_at=now, published=False)
+        for i in range(32)
+    ]
+
+@pytest.fixture
+def posts(post_pool):
+    """Fresh, unscheduled copies of the pooled posts for a single test."""
+    return [post.model_copy() for post in post_pool]
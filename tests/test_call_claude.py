@@ -0,0 +1,73 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+import anthropic
+
+import agent_flow
+from agent_flow import _call_claude
+
+def make_rate_limit_error(retry_after=None):
+    """Build a RateLimitError as the SDK raises it for a 429 response."""
+    headers = {"retry-after": retry_after} if retry_after is not None else {}
+    response = MagicMock(status_code=429, headers=headers)
+    return anthropic.RateLimitError("rate limited", response=response, body=None)
+
+class TestCallClaudeRetry(unittest.TestCase):
+    """Test class for the retry behaviour around Anthropic API calls."""
+    
+    def setUp(self):
+        """Stub out backoff sleeps and jitter."""
+        for patcher in (
+            patch('agent_flow.time.sleep'),
+            patch('agent_flow.random.uniform', return_value=1.0),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.client = MagicMock()
+    
+    def test_retries_rate_limit_using_retry_after(self):
+        """Test that a 429 is retried after the delay the server asked for."""
+        message = MagicMock()
+        self.client.messages.create.side_effect = [make_rate_limit_error("3"), message]
+        
+        result = _call_claude(self.client, "system", "hello", max_tokens=10)
+        
+        self.assertIs(result, message)
+        self.assertEqual(self.client.messages.create.call_count, 2)
+        agent_flow.time.sleep.assert_called_once_with(3.0)
+    
+    def test_gives_up_after_max_retries_with_exponential_backoff(self):
+        """Test that retries back off exponentially and the last error is raised."""
+        self.client.messages.create.side_effect = make_rate_limit_error()
+        
+        with self.assertRaises(anthropic.RateLimitError):
+            _call_claude(self.client, "system", "hello", max_tokens=10)
+        
+        # One initial attempt plus max_retries=4 retries
+        self.assertEqual(self.client.messages.create.call_count, 5)
+        self.assertEqual(
+            [call.args[0] for call in agent_flow.time.sleep.call_args_list],
+            [1, 2, 4, 8]
+        )
+    
+    def test_semaphore_is_released_while_backing_off(self):
+        """Test that a concurrency slot is not held during the backoff sleep."""
+        held = []
+        agent_flow.time.sleep.side_effect = lambda seconds: held.append(agent_flow._ANTHROPIC_SEM._value)
+        self.client.messages.create.side_effect = [make_rate_limit_error("1"), MagicMock()]
+        
+        _call_claude(self.client, "system", "hello", max_tokens=10)
+        
+        self.assertEqual(held, [agent_flow.ANTHROPIC_MAX_CONCURRENCY])
+    
+    @patch('agent_flow.anthropic.Anthropic', autospec=True)
+    def test_client_disables_sdk_retries(self, mock_anthropic_class):
+        """Test that the shared client leaves retrying to retry_anthropic_api."""
+        with patch.object(agent_flow, '_ANTHROPIC_CLIENT', None):
+            client = agent_flow._get_client()
+        
+        self.assertIs(client, mock_anthropic_class.return_value)
+        self.assertEqual(mock_anthropic_class.call_args.kwargs['max_retries'], 0)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,34 @@
+import json
+import unittest
+
+from agent_flow import _extract_json
+
+EXPECTED = {"newsletter_name": "AI Weekly", "topics": [{"title": "GPT-4.5", "references": ["OpenAI"]}]}
+RAW = '{"newsletter_name": "AI Weekly", "topics": [{"title": "GPT-4.5", "references": ["OpenAI"]}]}'
+
+class TestExtractJson(unittest.TestCase):
+    """Test class for parsing JSON out of Claude responses."""
+    
+    def test_clean_json(self):
+        """Test a response that is only the JSON object."""
+        self.assertEqual(_extract_json(RAW), EXPECTED)
+    
+    def test_leading_prose(self):
+        """Test a response with an introduction before the JSON."""
+        self.assertEqual(_extract_json(f"Here are the topics you asked for:\n\n{RAW}"), EXPECTED)
+    
+    def test_fenced_code_block(self):
+        """Test a response wrapped in a ```json code fence."""
+        self.assertEqual(_extract_json(f"```json\n{RAW}\n```"), EXPECTED)
+    
+    def test_trailing_text(self):
+        """Test a response with commentary after the JSON."""
+        self.assertEqual(_extract_json(f"{RAW}\n\nLet me know if you want more topics."), EXPECTED)
+    
+    def test_no_json_object(self):
+        """Test that a response without any '{' raises JSONDecodeError."""
+        with self.assertRaises(json.JSONDecodeError):
+            _extract_json("Sorry, I could not find any topics in this newsletter.")
+
+if __name__ == "__main__":
+    unittest.main()
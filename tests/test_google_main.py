@@ -0,0 +1,221 @@
+import os
+import base64
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from google_api import google_main
+
+class TestOnlyNew(unittest.TestCase):
+    """Test class for the only_new check in process_latest_email_from_sender."""
+    
+    def setUp(self):
+        """Point the state file at a temporary directory and mock the Gmail service."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        
+        for patcher in (
+            patch.object(google_main, 'STATE_FILE', os.path.join(self.tmp_dir.name, '.state.json')),
+            patch.object(google_main, 'get_gmail_service', return_value=MagicMock()),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        
+        self.service = google_main.get_gmail_service.return_value
+        self.users = self.service.users.return_value
+        self.messages = self.users.messages.return_value
+        
+        # Mailbox is at historyId 200 and the sender's newest message is m1
+        self.users.getProfile.return_value.execute.return_value = {'historyId': '200'}
+        self.messages.list.return_value.execute.return_value = {'messages': [{'id': 'm1'}]}
+        self.messages.get.return_value.execute.return_value = {
+            'id': 'm1',
+            'historyId': '150',
+            'payload': {
+                'headers': [{'name': 'Subject', 'value': 'Weekly digest'}],
+                'body': {'data': base64.urlsafe_b64encode(b'Newsletter body').decode()}
+            }
+        }
+    
+    def test_skips_without_listing_when_mailbox_unchanged(self):
+        """Test that no list or get request is made when nothing was added to the mailbox."""
+        google_main.save_sender_state('news@example.com', history_id='200', message_id='m1')
+        self.users.history.return_value.list.return_value.execute.return_value = {'historyId': '200'}
+        
+        with self.assertRaises(google_main.NoNewMessages):
+            google_main.process_latest_email_from_sender('news@example.com', only_new=True)
+        
+        self.messages.list.assert_not_called()
+        self.messages.get.assert_not_called()
+    
+    def test_skips_processed_message_when_other_mail_arrived(self):
+        """Test that unrelated new mail does not cause the old newsletter to be reprocessed."""
+        google_main.save_sender_state('news@example.com', history_id='100', message_id='m1')
+        self.users.history.return_value.list.return_value.execute.return_value = {
+            'history': [{'id': '180'}], 'historyId': '200'
+        }
+        
+        with self.assertRaises(google_main.NoNewMessages):
+            google_main.process_latest_email_from_sender('news@example.com', only_new=True)
+        
+        self.messages.get.assert_not_called()
+        self.assertEqual(
+            google_main.load_sender_state('news@example.com'),
+            {'history_id': '200', 'message_id': 'm1'}
+        )
+    
+    def test_fetches_new_message_without_marking_it_processed(self):
+        """Test that a new newsletter is returned with the mailbox historyId, leaving state to the caller."""
+        google_main.save_sender_state('news@example.com', history_id='100', message_id='m0')
+        self.users.history.return_value.list.return_value.execute.return_value = {
+            'history': [{'id': '150'}], 'historyId': '200'
+        }
+        
+        result = google_main.process_latest_email_from_sender('news@example.com', only_new=True)
+        
+        self.assertEqual(result['id'], 'm1')
+        self.assertEqual(result['body'], 'Newsletter body')
+        self.assertEqual(result['history_id'], '200')
+        self.assertEqual(
+            google_main.load_sender_state('news@example.com'),
+            {'history_id': '100', 'message_id': 'm0'}
+        )
+    
+    def test_plain_fetch_does_not_write_state(self):
+        """Test that a fetch without only_new leaves .state.json alone."""
+        result = google_main.process_latest_email_from_sender('news@example.com')
+        
+        self.assertEqual(result['id'], 'm1')
+        self.assertNotIn('history_id', result)
+        self.assertFalse(os.path.exists(google_main.STATE_FILE))
+
+def make_message(message_id):
+    """Build a full Gmail message resource whose body is its own ID."""
+    return {
+        'id': message_id,
+        'payload': {
+            'headers': [{'name': 'Subject', 'value': f'Subject {message_id}'}],
+            'body': {'data': base64.urlsafe_b64encode(message_id.encode()).decode()}
+        }
+    }
+
+class FakeRequest:
+    """Stand-in for a googleapiclient request that returns a fixed response."""
+    
+    def __init__(self, response):
+        self.response = response
+    
+    def execute(self):
+        return self.response
+
+class FakeBatch:
+    """Stand-in for a Gmail batch request that answers in reverse order."""
+    
+    def __init__(self, callback, failing_ids, sizes):
+        self.callback = callback
+        self.failing_ids = failing_ids
+        self.sizes = sizes
+        self.request_ids = []
+    
+    def add(self, request, request_id):
+        self.request_ids.append(request_id)
+    
+    def execute(self):
+        self.sizes.append(len(self.request_ids))
+        for request_id in reversed(self.request_ids):
+            if request_id in self.failing_ids:
+                self.callback(request_id, None, Exception("Backend error"))
+            else:
+                self.callback(request_id, make_message(request_id), None)
+
+class TestProcessLatestEmails(unittest.TestCase):
+    """Test class for batched fetching in process_latest_emails_from_sender."""
+    
+    def setUp(self):
+        """Mock a Gmail service whose messages are listed as pages of stubs."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        
+        self.service = MagicMock()
+        self.messages = self.service.users.return_value.messages.return_value
+        self.failing_ids = set()
+        self.batch_sizes = []
+        self.service.new_batch_http_request.side_effect = (
+            lambda callback: FakeBatch(callback, self.failing_ids, self.batch_sizes)
+        )
+        
+        for patcher in (
+            patch.object(google_main, 'SEEN_DB', os.path.join(self.tmp_dir.name, 'seen_msgs.db')),
+            patch.object(google_main, 'get_gmail_service', return_value=self.service),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+    
+    def set_pages(self, *pages):
+        """Serve each list of message IDs as one messages.list page."""
+        requests = [FakeRequest({'messages': [{'id': message_id} for message_id in page]}) for page in pages]
+        self.messages.list.return_value = requests[0]
+        self.messages.list_next.side_effect = lambda request, response: (
+            requests[requests.index(request) + 1] if request is not requests[-1] else None
+        )
+    
+    def test_order_is_restored_across_batches(self):
+        """Test that more than 100 messages are fetched in batches and returned newest first."""
+        message_ids = [f"m{i:03d}" for i in range(250)]
+        self.set_pages(message_ids)
+        
+        emails = google_main.process_latest_emails_from_sender('news@example.com', max_results=250)
+        
+        self.assertEqual(self.batch_sizes, [100, 100, 50])
+        self.assertEqual([email['id'] for email in emails], message_ids)
+        self.assertEqual(emails[0]['body'], 'm000')
+    
+    def test_failed_messages_are_skipped(self):
+        """Test that a message whose batch callback reports an error is left out."""
+        self.set_pages(['m1', 'm2', 'm3'])
+        self.failing_ids.add('m2')
+        
+        emails = google_main.process_latest_emails_from_sender('news@example.com')
+        
+        self.assertEqual([email['id'] for email in emails], ['m1', 'm3'])
+    
+    def test_skip_seen_makes_no_get_requests_on_second_call(self):
+        """Test that messages downloaded by an earlier skip_seen call are not fetched again."""
+        self.set_pages(['m1', 'm2'])
+        first = google_main.process_latest_emails_from_sender('news@example.com', skip_seen=True)
+        self.assertEqual([email['id'] for email in first], ['m1', 'm2'])
+        
+        self.messages.get.reset_mock()
+        self.batch_sizes.clear()
+        self.set_pages(['m3', 'm1', 'm2'])
+        second = google_main.process_latest_emails_from_sender('news@example.com', skip_seen=True)
+        self.assertEqual([email['id'] for email in second], ['m3'])
+        self.assertEqual(self.batch_sizes, [1])
+        
+        self.messages.get.reset_mock()
+        self.batch_sizes.clear()
+        third = google_main.process_latest_emails_from_sender('news@example.com', skip_seen=True)
+        self.assertEqual(third, [])
+        self.messages.get.assert_not_called()
+        self.assertEqual(self.batch_sizes, [])
+    
+    def test_iter_messages_follows_list_next(self):
+        """Test that pagination follows nextPageToken via list_next until it returns None."""
+        self.set_pages(['m1', 'm2'], ['m3', 'm4'], ['m5'])
+        
+        message_ids = [message['id'] for message in google_main.iter_messages(self.service, 'from:news@example.com', page_size=2)]
+        
+        self.assertEqual(message_ids, ['m1', 'm2', 'm3', 'm4', 'm5'])
+        self.assertEqual(self.messages.list_next.call_count, 3)
+    
+    def test_max_results_stops_paging_early(self):
+        """Test that no further page is requested once max_results messages were listed."""
+        self.set_pages(['m1', 'm2'], ['m3', 'm4'], ['m5'])
+        
+        emails = google_main.process_latest_emails_from_sender('news@example.com', max_results=2)
+        
+        self.assertEqual([email['id'] for email in emails], ['m1', 'm2'])
+        self.messages.list_next.assert_not_called()
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,7 +4,6 @@ import json
 import logging
 import unittest
 import sys
-from dotenv import load_dotenv
 
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -21,9 +20,6 @@ logging.basicConfig(
 )
 logger = logging.getLogger("test_linkedin_post")
 
-# Load environment variables
-load_dotenv()
-
 class TestLinkedInPostGeneration(unittest.TestCase):
     """Test class for LinkedIn post generation functionality."""
     
@@ -75,7 +71,7 @@ class TestLinkedInPostGeneration(unittest.TestCase):
         self.assertFalse(linkedin_post.published, "Post should not be marked as published")
         
         # Display the generated post
-        logger.info(f"Successfully generated LinkedIn post in {elapsed_time:.2f} seconds")
+        logger.info("Successfully generated LinkedIn post in %.2f seconds", elapsed_time)
         print(f"\nTopic: {linkedin_post.topic_title}")
         print(f"Generated at: {linkedin_post.generated_at}")
         print("-" * 50)
@@ -126,7 +122,7 @@ class TestLinkedInPostGeneration(unittest.TestCase):
             f"None of the references {self.sample_topic['references']} were mentioned in the post"
         )
         
-        logger.info(f"References mentioned in post: {references_mentioned}")
+        logger.info("References mentioned in post: %s", references_mentioned)
 
 if __name__ == "__main__":
     logger.info("Starting LinkedIn post generation tests")
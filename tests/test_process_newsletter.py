@@ -0,0 +1,81 @@
+import os
+import base64
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+import agent_flow
+from agent_flow import LinkedInPost, process_newsletter_to_scheduled_posts
+from google_api import google_main
+
+TOPICS = {
+    "newsletter_name": "AI Weekly",
+    "date": "March 03, 2025",
+    "topics": [{"title": "GPT-4.5", "summary": "", "key_points": [], "thoughts": "", "references": []}]
+}
+
+class TestOnlyNewPipeline(unittest.TestCase):
+    """Test class for when --only-new marks a newsletter as processed."""
+    
+    def setUp(self):
+        """Mock Gmail with one newsletter (m1) and point the state file at a temporary directory."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        
+        service = MagicMock()
+        users = service.users.return_value
+        users.getProfile.return_value.execute.return_value = {'historyId': '200'}
+        users.history.return_value.list.return_value.execute.return_value = {'history': [{'id': '150'}]}
+        users.messages.return_value.list.return_value.execute.return_value = {'messages': [{'id': 'm1'}]}
+        users.messages.return_value.get.return_value.execute.return_value = {
+            'id': 'm1',
+            'payload': {
+                'headers': [{'name': 'Subject', 'value': 'AI Weekly: GPT-4.5'}],
+                'body': {'data': base64.urlsafe_b64encode(b'Newsletter body').decode()}
+            }
+        }
+        
+        for patcher in (
+            patch.object(google_main, 'STATE_FILE', os.path.join(self.tmp_dir.name, '.state.json')),
+            patch.object(google_main, 'get_gmail_service', return_value=service),
+            patch.object(agent_flow, 'generate_linkedin_post', side_effect=self.make_post),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+    
+    def make_post(self, topic):
+        """Stand-in for generate_linkedin_post."""
+        return LinkedInPost(topic_title=topic['title'], content="Post", generated_at="2025-03-03 08:00:00")
+    
+    def run_only_new(self):
+        return process_newsletter_to_scheduled_posts('news@example.com', num_topics=1, only_new=True)
+    
+    @patch('agent_flow.extract_topics_with_anthropic')
+    def test_failed_run_is_retried_on_next_run(self, mock_extract):
+        """Test that a newsletter is only marked processed once posts were scheduled."""
+        mock_extract.return_value = None
+        self.assertEqual(self.run_only_new(), [])
+        self.assertEqual(google_main.load_sender_state('news@example.com'), {})
+        
+        mock_extract.side_effect = lambda content, num_topics: dict(TOPICS)
+        posts = self.run_only_new()
+        
+        self.assertEqual(len(posts), 1)
+        self.assertEqual(mock_extract.call_count, 2)
+        self.assertEqual(
+            google_main.load_sender_state('news@example.com'),
+            {'history_id': '200', 'message_id': 'm1'}
+        )
+    
+    @patch('agent_flow.extract_topics_with_anthropic')
+    def test_nothing_new_is_an_info_level_skip(self, mock_extract):
+        """Test that an already processed newsletter is skipped without Claude calls or error logs."""
+        google_main.save_sender_state('news@example.com', history_id='100', message_id='m1')
+        
+        with self.assertNoLogs(agent_flow.logger, level='WARNING'):
+            self.assertEqual(self.run_only_new(), [])
+        
+        mock_extract.assert_not_called()
+
+if __name__ == "__main__":
+    unittest.main()
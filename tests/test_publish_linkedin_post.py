@@ -3,13 +3,13 @@ import time
 import unittest
 import sys
 import logging
-from unittest.mock import patch, MagicMock
+from unittest.mock import MagicMock, patch
 from datetime import datetime
-from dotenv import load_dotenv
 
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from agent_flow import publish_linkedin_post, LinkedInPost
+import agent_flow
+from agent_flow import publish_linkedin_post, publish_scheduled_posts, LinkedInPost
 
 # Configure logging
 logging.basicConfig(
@@ -22,14 +22,14 @@ logging.basicConfig(
 )
 logger = logging.getLogger("test_publish_linkedin_post")
 
-# Load environment variables
-load_dotenv()
-
 class TestPublishLinkedInPost(unittest.TestCase):
     """Test class for LinkedIn post publishing functionality."""
     
     def setUp(self):
         """Set up test fixtures."""
+        # Start every test without a cached LinkedIn session
+        agent_flow._AUTH_SINGLETON = None
+        
         # Create a sample LinkedIn post for testing
         self.test_post = LinkedInPost(
             topic_title="GPT-4.5 Launch: Mixed Reception and High Pricing",
@@ -47,22 +47,20 @@ I'm curious to hear from others using these models in production. What's your ta
             published=False
         )
     
-    @patch('agent_flow.LinkedInAuth')
-    @patch('agent_flow.LinkedInPoster')
+    @patch('agent_flow.LinkedInAuth', autospec=True)
+    @patch('agent_flow.LinkedInPoster', autospec=True)
     def test_publish_linkedin_post_success(self, mock_poster_class, mock_auth_class):
         """Test successful publishing of a LinkedIn post."""
         logger.info("Testing successful LinkedIn post publishing")
         
         # Configure mocks
-        mock_auth = MagicMock()
+        mock_auth = mock_auth_class.return_value
         mock_auth.authenticate.return_value = True
         mock_auth.access_token = "mock_access_token"
         mock_auth.person_id = "mock_person_id"
-        mock_auth_class.return_value = mock_auth
         
-        mock_poster = MagicMock()
+        mock_poster = mock_poster_class.return_value
         mock_poster.post_message.return_value = True
-        mock_poster_class.return_value = mock_poster
         
         # Call the function
         result = publish_linkedin_post(self.test_post)
@@ -78,16 +76,15 @@ I'm curious to hear from others using these models in production. What's your ta
         
         logger.info("Successfully tested LinkedIn post publishing")
     
-    @patch('agent_flow.LinkedInAuth')
-    @patch('agent_flow.LinkedInPoster')
+    @patch('agent_flow.LinkedInAuth', autospec=True)
+    @patch('agent_flow.LinkedInPoster', autospec=True)
     def test_publish_linkedin_post_auth_failure(self, mock_poster_class, mock_auth_class):
         """Test LinkedIn post publishing with authentication failure."""
         logger.info("Testing LinkedIn post publishing with authentication failure")
         
         # Configure mocks
-        mock_auth = MagicMock()
+        mock_auth = mock_auth_class.return_value
         mock_auth.authenticate.return_value = False
-        mock_auth_class.return_value = mock_auth
         
         # Call the function
         result = publish_linkedin_post(self.test_post)
@@ -102,22 +99,20 @@ I'm curious to hear from others using these models in production. What's your ta
         
         logger.info("Successfully tested LinkedIn post publishing with authentication failure")
     
-    @patch('agent_flow.LinkedInAuth')
-    @patch('agent_flow.LinkedInPoster')
+    @patch('agent_flow.LinkedInAuth', autospec=True)
+    @patch('agent_flow.LinkedInPoster', autospec=True)
     def test_publish_linkedin_post_posting_failure(self, mock_poster_class, mock_auth_class):
         """Test LinkedIn post publishing with posting failure."""
         logger.info("Testing LinkedIn post publishing with posting failure")
         
         # Configure mocks
-        mock_auth = MagicMock()
+        mock_auth = mock_auth_class.return_value
         mock_auth.authenticate.return_value = True
         mock_auth.access_token = "mock_access_token"
         mock_auth.person_id = "mock_person_id"
-        mock_auth_class.return_value = mock_auth
         
-        mock_poster = MagicMock()
+        mock_poster = mock_poster_class.return_value
         mock_poster.post_message.return_value = False
-        mock_poster_class.return_value = mock_poster
         
         # Call the function
         result = publish_linkedin_post(self.test_post)
@@ -133,15 +128,55 @@ I'm curious to hear from others using these models in production. What's your ta
         
         logger.info("Successfully tested LinkedIn post publishing with posting failure")
     
-    @patch('agent_flow.LinkedInAuth')
+    @patch('agent_flow.LinkedInAuth', autospec=True)
+    @patch('agent_flow.LinkedInPoster', autospec=True)
+    def test_publish_linkedin_post_reuses_auth(self, mock_poster_class, mock_auth_class):
+        """Test that consecutive posts share one LinkedIn authentication."""
+        logger.info("Testing LinkedIn authentication reuse across posts")
+        
+        # Configure mocks
+        mock_auth = mock_auth_class.return_value
+        mock_auth.authenticate.return_value = True
+        mock_auth.access_token = "mock_access_token"
+        mock_auth.person_id = "mock_person_id"
+        mock_auth.expires_at = time.time() + 3600
+        
+        mock_poster = mock_poster_class.return_value
+        mock_poster.post_message.return_value = True
+        
+        # Publish twice
+        self.assertTrue(publish_linkedin_post(self.test_post))
+        self.test_post.published = False
+        self.assertTrue(publish_linkedin_post(self.test_post))
+        
+        # Verify authentication happened only once
+        mock_auth_class.assert_called_once()
+        mock_auth.authenticate.assert_called_once()
+        self.assertEqual(mock_poster.post_message.call_count, 2)
+        
+        logger.info("Successfully tested LinkedIn authentication reuse")
+    
+    @patch('agent_flow.LinkedInAuth', autospec=True)
+    def test_expired_auth_is_closed_and_replaced(self, mock_auth_class):
+        """Test that a cached authentication near expiry is closed before re-authenticating."""
+        expiring_auth = MagicMock(expires_at=time.time() + 60)
+        agent_flow._AUTH_SINGLETON = expiring_auth
+        mock_auth_class.return_value.authenticate.return_value = True
+        
+        auth = agent_flow.get_auth()
+        
+        self.assertIs(auth, mock_auth_class.return_value)
+        expiring_auth.close.assert_called_once()
+        mock_auth_class.return_value.close.assert_not_called()
+    
+    @patch('agent_flow.LinkedInAuth', autospec=True)
     def test_publish_linkedin_post_exception(self, mock_auth_class):
         """Test LinkedIn post publishing with an exception."""
         logger.info("Testing LinkedIn post publishing with an exception")
         
         # Configure mock to raise an exception
-        mock_auth = MagicMock()
+        mock_auth = mock_auth_class.return_value
         mock_auth.authenticate.side_effect = Exception("Test exception")
-        mock_auth_class.return_value = mock_auth
         
         # Call the function
         result = publish_linkedin_post(self.test_post)
@@ -155,6 +190,114 @@ I'm curious to hear from others using these models in production. What's your ta
         
         logger.info("Successfully tested LinkedIn post publishing with an exception")
 
+class TestPublishScheduledPosts(unittest.TestCase):
+    """Test class for publishing the scheduled posts that are due."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        # Start every test without a cached LinkedIn session
+        agent_flow._AUTH_SINGLETON = None
+        
+        self.generated_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    
+    def make_post(self, content, scheduled_for="2025-03-03 09:00:00", published=False):
+        """Create a post; the default scheduled time is already in the past."""
+        return LinkedInPost(
+            topic_title=f"Topic for {content}",
+            content=content,
+            generated_at=self.generated_at,
+            scheduled_for=scheduled_for,
+            published=published
+        )
+    
+    def configure_mocks(self, mock_poster_class, mock_auth_class, authenticated=True):
+        """Make LinkedInAuth authenticate and LinkedInPoster post successfully by default."""
+        mock_auth = mock_auth_class.return_value
+        mock_auth.authenticate.return_value = authenticated
+        mock_auth.access_token = "mock_access_token"
+        mock_auth.person_id = "mock_person_id"
+        mock_auth.expires_at = time.time() + 3600
+        
+        mock_poster = mock_poster_class.return_value
+        mock_poster.post_message.return_value = True
+        return mock_auth, mock_poster
+    
+    @patch('agent_flow.LinkedInAuth', autospec=True)
+    @patch('agent_flow.LinkedInPoster', autospec=True)
+    def test_authenticates_once_for_all_due_posts(self, mock_poster_class, mock_auth_class):
+        """Test that N due posts share one authentication and at most one poster per worker."""
+        mock_auth, mock_poster = self.configure_mocks(mock_poster_class, mock_auth_class)
+        posts = [self.make_post(f"Post {i}") for i in range(10)]
+        
+        published = publish_scheduled_posts(posts)
+        
+        self.assertEqual(published, posts)
+        self.assertTrue(all(post.published for post in posts))
+        mock_auth_class.assert_called_once()
+        mock_auth.authenticate.assert_called_once()
+        self.assertEqual(mock_poster.post_message.call_count, 10)
+        
+        # Workers reuse their poster, and every poster is closed at the end
+        self.assertLessEqual(mock_poster_class.call_count, agent_flow.PUBLISH_MAX_WORKERS)
+        self.assertEqual(mock_poster.close.call_count, mock_poster_class.call_count)
+    
+    @patch('agent_flow.LinkedInAuth', autospec=True)
+    @patch('agent_flow.LinkedInPoster', autospec=True)
+    def test_returns_only_successfully_published_posts(self, mock_poster_class, mock_auth_class):
+        """Test that posts LinkedIn rejected are left out of the result."""
+        _, mock_poster = self.configure_mocks(mock_poster_class, mock_auth_class)
+        mock_poster.post_message.side_effect = lambda content: content != "Rejected"
+        posts = [self.make_post("Accepted"), self.make_post("Rejected"), self.make_post("Also accepted")]
+        
+        published = publish_scheduled_posts(posts)
+        
+        self.assertEqual(published, [posts[0], posts[2]])
+        self.assertFalse(posts[1].published)
+    
+    @patch('agent_flow.LinkedInAuth', autospec=True)
+    @patch('agent_flow.LinkedInPoster', autospec=True)
+    def test_returns_empty_list_when_auth_fails(self, mock_poster_class, mock_auth_class):
+        """Test that nothing is posted when LinkedIn authentication fails."""
+        self.configure_mocks(mock_poster_class, mock_auth_class, authenticated=False)
+        posts = [self.make_post("Post 1"), self.make_post("Post 2")]
+        
+        published = publish_scheduled_posts(posts)
+        
+        self.assertEqual(published, [])
+        mock_poster_class.assert_not_called()
+        self.assertFalse(any(post.published for post in posts))
+        mock_auth_class.return_value.close.assert_called_once()
+    
+    @patch('agent_flow.LinkedInAuth', autospec=True)
+    @patch('agent_flow.LinkedInPoster', autospec=True)
+    def test_returns_empty_list_when_auth_raises(self, mock_poster_class, mock_auth_class):
+        """Test that an exception during authentication is logged rather than raised."""
+        mock_auth, _ = self.configure_mocks(mock_poster_class, mock_auth_class)
+        mock_auth.authenticate.side_effect = OSError("Address already in use")
+        
+        published = publish_scheduled_posts([self.make_post("Post 1")])
+        
+        self.assertEqual(published, [])
+        mock_poster_class.assert_not_called()
+        mock_auth.close.assert_called_once()
+    
+    @patch('agent_flow.LinkedInAuth', autospec=True)
+    @patch('agent_flow.LinkedInPoster', autospec=True)
+    def test_does_not_authenticate_when_nothing_is_due(self, mock_poster_class, mock_auth_class):
+        """Test that future, already published and unscheduled posts need no authentication."""
+        self.configure_mocks(mock_poster_class, mock_auth_class)
+        posts = [
+            self.make_post("Future", scheduled_for="2999-01-01 09:00:00"),
+            self.make_post("Already published", published=True),
+            self.make_post("Unscheduled", scheduled_for=None),
+        ]
+        
+        published = publish_scheduled_posts(posts)
+        
+        self.assertEqual(published, [])
+        mock_auth_class.assert_not_called()
+        mock_poster_class.assert_not_called()
+
 if __name__ == "__main__":
     logger.info("Starting LinkedIn post publishing tests")
     unittest.main() 
\ No newline at end of file
@@ -1,74 +1,42 @@
-import unittest
-import time
-from datetime import datetime
-import sys
-import os
+import pytest
+from agent_flow import schedule_linkedin_posts
 
-# Add parent directory to path to import agent_flow
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from agent_flow import LinkedInPost, schedule_linkedin_posts
+# Posts must be scheduled between 9 AM and 5 PM
+_BIZ_HOURS = range(9, 18)
 
-class TestScheduler(unittest.TestCase):
-    """Test cases for the LinkedIn post scheduler function."""
+def test_schedule_posts_empty_list():
+    """Test scheduling with an empty list of posts."""
+    result = schedule_linkedin_posts([])
+    assert len(result) == 0
+
+def test_schedule_single_post(posts):
+    """Test scheduling a single post."""
+    result = schedule_linkedin_posts(posts[:1])
     
-    def test_schedule_posts_empty_list(self):
-        """Test scheduling with an empty list of posts."""
-        result = schedule_linkedin_posts([])
-        self.assertEqual(len(result), 0)
+    assert len(result) == 1
+    assert result[0].scheduled_for is not None
     
-    def test_schedule_single_post(self):
-        """Test scheduling a single post."""
-        post = LinkedInPost(
-            topic_title="Test Topic",
-            content="This is a test post",
-            generated_at=time.strftime("%Y-%m-%d %H:%M:%S"),
-            published=False
-        )
-        
-        result = schedule_linkedin_posts([post])
-        
-        self.assertEqual(len(result), 1)
-        self.assertIsNotNone(result[0].scheduled_for)
-        
-        # Parse the scheduled time
-        scheduled_time = datetime.strptime(result[0].scheduled_for, "%Y-%m-%d %H:%M:%S")
-        
-        # Verify scheduled hour is between 9 AM and 5 PM
-        hour = scheduled_time.hour
-        self.assertGreaterEqual(hour, 9)
-        self.assertLessEqual(hour, 17)
+    # Read the hour straight from the "%Y-%m-%d %H:%M:%S" string
+    hour = int(result[0].scheduled_for[11:13])
     
-    def test_schedule_multiple_posts(self):
-        """Test scheduling multiple posts over 3 days."""
-        posts = []
-        for i in range(5):
-            post = LinkedInPost(
-                topic_title=f"Test Topic {i+1}",
-                content=f"This is test post {i+1}",
-                generated_at=time.strftime("%Y-%m-%d %H:%M:%S"),
-                published=False
-            )
-            posts.append(post)
-        
-        result = schedule_linkedin_posts(posts)
-        
-        # Verify all posts are scheduled
-        self.assertEqual(len(result), 5)
-        for post in result:
-            self.assertIsNotNone(post.scheduled_for)
-        
-        # Verify all scheduled hours are between 9 AM and 5 PM
-        scheduled_times = []
-        for post in result:
-            scheduled_time = datetime.strptime(post.scheduled_for, "%Y-%m-%d %H:%M:%S")
-            hour = scheduled_time.hour
-            self.assertGreaterEqual(hour, 9)
-            self.assertLessEqual(hour, 17)
-            scheduled_times.append(scheduled_time)
-        
-        # Verify posts are distributed across multiple days
-        days = set([time.day for time in scheduled_times])
-        self.assertGreaterEqual(len(days), 2, "Posts should be distributed across at least 2 days")
+    # Verify scheduled hour is between 9 AM and 5 PM
+    assert hour in _BIZ_HOURS
 
-if __name__ == "__main__":
-    unittest.main() 
\ No newline at end of file
+@pytest.mark.parametrize("n", [1, 5, 20])
+def test_schedule_multiple_posts(posts, n):
+    """Test scheduling n posts over 3 days."""
+    assert all(post.scheduled_for is None for post in posts[:n])
+    
+    result = schedule_linkedin_posts(posts[:n])
+    
+    # Verify all posts are scheduled
+    assert len(result) == n
+    assert all(post.scheduled_for is not None for post in result)
+    
+    # Verify all scheduled hours are between 9 AM and 5 PM
+    assert all(int(post.scheduled_for[11:13]) in _BIZ_HOURS for post in result)
+    
+    # Verify posts are distributed across multiple days, stopping at the first different day
+    if n > 1:
+        first = result[0].scheduled_for[8:10]
+        assert any(post.scheduled_for[8:10] != first for post in result[1:]), "Posts should be distributed across at least 2 days"
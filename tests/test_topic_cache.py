@@ -0,0 +1,62 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+import topic_cache
+
+def get_or_call(body, num_topics, fn, model="claude-test", system_prompt="Extract topics."):
+    """Call topic_cache.get_or_call with a fixed model and prompt unless overridden."""
+    return topic_cache.get_or_call(body, num_topics, fn, model=model, system_prompt=system_prompt)
+
+class TestTopicCache(unittest.TestCase):
+    """Test class for the topic extraction cache."""
+    
+    def setUp(self):
+        """Point the cache at a temporary database."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        patcher = patch.object(topic_cache, 'CACHE_DB', os.path.join(self.tmp_dir.name, 'topic_cache.db'))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmp_dir.cleanup)
+    
+    def test_second_call_is_served_from_cache(self):
+        """Test that the same body and topic count only calls fn once."""
+        fn = MagicMock(return_value={"topics": [{"title": "AI"}]})
+        
+        first = get_or_call("newsletter body", 3, fn)
+        second = get_or_call("newsletter body", 3, fn)
+        
+        self.assertEqual(first, {"topics": [{"title": "AI"}]})
+        self.assertEqual(second, first)
+        fn.assert_called_once()
+    
+    def test_topic_count_is_part_of_key(self):
+        """Test that a different topic count misses the cache."""
+        fn = MagicMock(return_value={"topics": []})
+        
+        get_or_call("newsletter body", 3, fn)
+        get_or_call("newsletter body", 5, fn)
+        
+        self.assertEqual(fn.call_count, 2)
+    
+    def test_model_and_prompt_are_part_of_key(self):
+        """Test that changing the model or the system prompt misses the cache."""
+        fn = MagicMock(return_value={"topics": []})
+        
+        get_or_call("newsletter body", 3, fn)
+        get_or_call("newsletter body", 3, fn, model="claude-other")
+        get_or_call("newsletter body", 3, fn, system_prompt="Extract different topics.")
+        
+        self.assertEqual(fn.call_count, 3)
+    
+    def test_failures_are_not_cached(self):
+        """Test that a None result is retried on the next call."""
+        fn = MagicMock(side_effect=[None, {"topics": []}])
+        
+        self.assertIsNone(get_or_call("newsletter body", 3, fn))
+        self.assertEqual(get_or_call("newsletter body", 3, fn), {"topics": []})
+        self.assertEqual(fn.call_count, 2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import hashlib
+import sqlite3
+import threading
+from contextlib import closing
+
+import orjson
+
+CACHE_DB = 'topic_cache.db'
+
+_cache_lock = threading.Lock()
+
+def open_cache_db():
+    """Open the store of topic extraction results keyed by newsletter body."""
+    conn = sqlite3.connect(CACHE_DB)
+    conn.execute("CREATE TABLE IF NOT EXISTS topics (key TEXT PRIMARY KEY, result BLOB NOT NULL)")
+    return conn
+
+def _digest(text):
+    return hashlib.blake2b(text.encode()).hexdigest()
+
+def cache_key(body, num_topics, model, system_prompt):
+    """
+    Return the cache key for a newsletter body and topic count.
+
+    The model and a hash of the system prompt are part of the key, so changing
+    either one stops older results from being served.
+    """
+    return f"{model}:{_digest(system_prompt)[:16]}:{_digest(body)}:{num_topics}"
+
+def get_or_call(body, num_topics, fn, model, system_prompt):
+    """
+    Return the cached topics for a newsletter body, calling fn on a miss.
+
+    Args:
+        body (str): Newsletter body the topics are extracted from
+        num_topics (int): Number of topics requested
+        fn (callable): Zero-argument function producing the result on a miss
+        model (str): Model that fn calls
+        system_prompt (str): System prompt that fn sends
+
+    Returns:
+        dict: Cached or freshly computed result; None results are not cached
+    """
+    key = cache_key(body, num_topics, model, system_prompt)
+
+    with _cache_lock, closing(open_cache_db()) as conn:
+        row = conn.execute("SELECT result FROM topics WHERE key = ?", (key,)).fetchone()
+    if row is not None:
+        return orjson.loads(row[0])
+
+    result = fn()
+    if result is not None:
+        with _cache_lock, closing(open_cache_db()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO topics (key, result) VALUES (?, ?)",
+                (key, orjson.dumps(result))
+            )
+    return result